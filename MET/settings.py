@@ -11,8 +11,11 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 
+from MET.database import from_env
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -51,6 +54,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'hub.middleware.RequestMetricsMiddleware',
+    'hub.middleware.QueryProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -66,7 +71,9 @@ ROOT_URLCONF = 'MET.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # The stock Django backend, timing renders for hub.metrics.
+        'BACKEND': 'hub.metrics.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -85,12 +92,13 @@ WSGI_APPLICATION = 'MET.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# Built from DATABASE_URL (default: sqlite:///db.sqlite3) and
+# DATABASE_REPLICA_URLS; see MET/database.py. SQLite uses hub.sqlite, the
+# stock backend plus WAL/busy_timeout pragmas and BEGIN IMMEDIATE
+# transactions, so several Gunicorn workers can share the file.
+DATABASES = from_env(BASE_DIR)
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['hub.routers.ReadReplicaRouter']
 
 
 # Password validation
@@ -133,6 +141,19 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Evidence uploads on the dashboard are streamed to disk by
+# hub.uploadhandlers, hashed and size-checked per kind as they arrive. Other
+# forms (the admin included) keep Django's default upload handlers. The temp
+# dir shares MEDIA_ROOT's filesystem so storing an upload is a rename instead
+# of a second copy.
+EVIDENCE_UPLOAD_TEMP_DIR = MEDIA_ROOT / 'uploads' / '.incoming'
+EVIDENCE_UPLOAD_LIMITS = {
+    'image': int(os.environ.get('MAX_IMAGE_UPLOAD_MB', '20')) * 1024 * 1024,
+    'video': int(os.environ.get('MAX_VIDEO_UPLOAD_MB', '500')) * 1024 * 1024,
+}
+# Chunk size handed to clients of the resumable upload API (hub.resumable).
+RESUMABLE_CHUNK_SIZE = 5 * 1024 * 1024
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -142,3 +163,69 @@ AUTH_USER_MODEL = 'hub.CustomUser'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'welcome'
 LOGIN_URL = 'login'
+
+# Dashboard summary fragments (hub.caching) live in the default cache, and
+# saving an upload invalidates them by replacing a token in that cache. The
+# cache must therefore be shared by every Gunicorn worker: a file-based cache
+# by default, or Redis through CACHE_BACKEND/CACHE_LOCATION. A locmem cache
+# is only correct with a single process.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    }
+}
+# `manage.py test` gets a private locmem cache instead: entries in the shared
+# one never expire, so tokens and hit counters would leak from run to run.
+if sys.argv[1:2] == ['test']:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'met-hub-tests',
+        }
+    }
+DASHBOARD_CACHE_ALIAS = 'default'
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', '300'))
+
+# Route the read-only pages and /api/v1/ to their async variants
+# (hub.async_utils). Only worth enabling under an ASGI server such as
+# Gunicorn with uvicorn workers; see DEPLOYMENT_GUIDE.md.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+
+# Prediction engine used by run_predictors: a name from hub.prediction.BACKENDS
+# or a dotted path to a PredictionBackend subclass.
+PREDICTION_BACKEND = os.environ.get('PREDICTION_BACKEND', 'heuristic')
+
+# Days to keep raw statistic points and each rollup resolution before
+# downsample_statistics deletes them (None keeps them forever).
+STATISTIC_RETENTION_DAYS = {'raw': 30, 'minute': 2, 'hour': 90, 'day': None}
+
+# Login audit events (hub.audit) are buffered per process and written in
+# batches; events the database rejects are appended to the spool file and
+# replayed later. prune_login_logs keeps LOGIN_LOG_RETENTION_DAYS of history.
+LOGIN_AUDIT_BATCH_SIZE = int(os.environ.get('LOGIN_AUDIT_BATCH_SIZE', '50'))
+LOGIN_AUDIT_FLUSH_SECONDS = float(os.environ.get('LOGIN_AUDIT_FLUSH_SECONDS', '5'))
+LOGIN_AUDIT_SPOOL = os.environ.get('LOGIN_AUDIT_SPOOL', str(BASE_DIR / 'logs' / 'login_audit.jsonl'))
+LOGIN_LOG_RETENTION_DAYS = int(os.environ.get('LOGIN_LOG_RETENTION_DAYS', '180'))
+
+# Per-view request metrics (hub.metrics), served in the Prometheus text
+# format at /metrics/ to administrators or to requests carrying
+# "Authorization: Bearer <METRICS_TOKEN>". METRICS_SERVER_TIMING adds a
+# Server-Timing header with the app, SQL and template times to responses
+# for administrators; it is off by default.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True') == 'True'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', 'False') == 'True'
+
+# Development/staging SQL profiler (hub.profiling): per-request JSON reports
+# of every query with duplicate, N+1 and slow-statement findings, browsable
+# at /admin/query-profiles/. Far too slow to leave on in production.
+QUERY_PROFILER_ENABLED = os.environ.get('QUERY_PROFILER_ENABLED', 'False') == 'True'
+QUERY_PROFILER_DIR = os.environ.get('QUERY_PROFILER_DIR', str(BASE_DIR / 'logs' / 'query_profiles'))
+QUERY_PROFILER_SLOW_MS = float(os.environ.get('QUERY_PROFILER_SLOW_MS', '100'))
+QUERY_PROFILER_REPEAT = int(os.environ.get('QUERY_PROFILER_REPEAT', '3'))
+QUERY_PROFILER_KEEP = 200
+
+# Public upload IDs each process reserves at a time (hub.public_ids). Larger
+# blocks mean fewer sequence writes but bigger gaps when a worker restarts.
+PUBLIC_ID_BLOCK_SIZE = 100
@@ -19,7 +19,15 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from hub.views import query_profile_view, query_profiles_view
+
 urlpatterns = [
+    path("admin/query-profiles/", admin.site.admin_view(query_profiles_view), name="query_profiles"),
+    path(
+        "admin/query-profiles/<str:profile_id>/",
+        admin.site.admin_view(query_profile_view),
+        name="query_profile",
+    ),
     path("admin/", admin.site.urls),
     path("", include("hub.urls")),
 ]
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from .models import CustomUser, Project, Statistic, UserLoginLog
+from .models import CustomUser, Project, ProjectJob, Statistic, UserLoginLog
 
 
 @admin.register(CustomUser)
@@ -28,6 +28,10 @@ class ProjectAdmin(admin.ModelAdmin):
     list_filter = ("file_type", "verdict", "created_at")
     search_fields = ("public_id", "idea", "user__username", "file_name")
     readonly_fields = ("file_link", "file_size", "created_at")
+    list_select_related = ("user",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_related()
 
     def file_link(self, obj):
         if obj.file:
@@ -44,6 +48,10 @@ class StatisticAdmin(admin.ModelAdmin):
     list_display = ("metric_name", "metric_value", "project", "recorded_at")
     list_filter = ("metric_name", "recorded_at")
     search_fields = ("metric_name", "project__idea", "notes")
+    list_select_related = ("project",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_related()
 
 
 @admin.register(UserLoginLog)
@@ -51,3 +59,15 @@ class UserLoginLogAdmin(admin.ModelAdmin):
     list_display = ("user", "login_time", "ip_address")
     list_filter = ("login_time",)
     search_fields = ("user__username", "ip_address")
+    list_select_related = ("user",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_related()
+
+
+@admin.register(ProjectJob)
+class ProjectJobAdmin(admin.ModelAdmin):
+    list_display = ("project", "kind", "status", "attempts", "available_at", "locked_until")
+    list_filter = ("kind", "status")
+    search_fields = ("project__public_id", "claimed_by", "last_error")
+    list_select_related = ("project",)
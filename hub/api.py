@@ -0,0 +1,498 @@
+"""
+Read-only JSON API for dashboards and monitoring screens, mounted at
+`/api/v1/`.
+
+The endpoints serve the same data as the HTML pages (the cached summary
+fragment, the idea and month rollups, the confidence listing and single
+uploads) and use the same session login and administrator checks. Every
+response carries a strong ETag, and the aggregate endpoints also a
+Last-Modified, computed from the caller's `ProjectRollup` row: its upload
+count, confidence total and `updated_at` change whenever an upload in that
+scope is added, rescored, moved or deleted. The summary's 7-day count also
+depends on the clock, so its two validators also move on once per cache
+timeout. Checking them costs one single-row lookup, so a poll that sends `If-None-Match` or
+`If-Modified-Since` for unchanged data gets a 304 before any aggregate
+query runs.
+"""
+
+import asyncio
+import functools
+import hashlib
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from typing import Optional, Tuple
+
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_safe
+
+from . import caching, rollups, timeseries
+from .async_utils import (
+    alist,
+    async_cache_control,
+    async_condition,
+    async_require_safe,
+    authenticated_user,
+)
+from .models import CustomUser, Project, ProjectRollup, month_bounds
+from .pagination import akeyset_page, keyset_page
+
+VERSION = "v1"
+CONFIDENCE_LIMIT = 100
+MAX_CONFIDENCE_LIMIT = 1000
+
+DETAIL_FIELDS = (
+    "public_id",
+    "idea",
+    "file_type",
+    "file_name",
+    "file_size",
+    "thumbnail",
+    "prediction_confidence",
+    "verdict",
+    "created_at",
+)
+
+
+def is_admin(user: CustomUser) -> bool:
+    return user.is_staff or user.role == "admin"
+
+
+def error_response(message: str, status: int) -> JsonResponse:
+    return JsonResponse({"error": message}, status=status)
+
+
+def api_login_required(view):
+    """Like `login_required`, but answers 401 JSON instead of redirecting."""
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return error_response("Authentication required.", 401)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def api_admin_required(view):
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not is_admin(request.user):
+            return error_response("Only administrators can use this endpoint.", 403)
+        return view(request, *args, **kwargs)
+
+    return api_login_required(wrapper)
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def rollup_etag(request, rollup: ProjectRollup) -> str:
+    return _digest(
+        VERSION,
+        request.get_full_path(),
+        rollup.scope,
+        rollup.uploads,
+        rollup.scored,
+        rollup.confidence_total,
+        rollup.updated_at,
+    )
+
+
+def _summary_bucket() -> int:
+    # The 7-day count moves with the clock, so the summary validators also
+    # change once per cache timeout, the same staleness the HTML summary allows.
+    return int(time.time() // max(1, caching.timeout()))
+
+
+def summary_etag_for(request, rollup: ProjectRollup) -> str:
+    return _digest(rollup_etag(request, rollup), _summary_bucket())
+
+
+def summary_last_modified_for(rollup: ProjectRollup) -> datetime:
+    # The start of the current bucket, so If-Modified-Since expires with the ETag.
+    bucket_start = datetime.fromtimestamp(
+        _summary_bucket() * max(1, caching.timeout()), tz=dt_timezone.utc
+    )
+    return max(rollup.updated_at, bucket_start)
+
+
+def detail_etag_for(pk: int, row) -> str:
+    return _digest(VERSION, pk, *row) if row else None
+
+
+def _number(value):
+    return None if value is None else float(value)
+
+
+def _upload(project: Project) -> dict:
+    return {
+        "id": project.pk,
+        "public_id": project.public_id,
+        "username": project.user.username,
+        "idea": project.idea,
+        "file_type": project.file_type,
+        "prediction_confidence": _number(project.prediction_confidence),
+        "verdict": project.verdict,
+        "created_at": project.created_at.isoformat(),
+    }
+
+
+# Request parsing, queries and payloads shared by the sync views and their
+# async variants further down (built on hub.async_utils).
+
+
+def confidence_limit(request) -> int:
+    try:
+        limit = int(request.GET.get("limit", CONFIDENCE_LIMIT))
+    except ValueError:
+        raise ValueError("limit must be a number.")
+    return max(1, min(limit, MAX_CONFIDENCE_LIMIT))
+
+
+def confidence_rows(user: CustomUser, limit: int):
+    return (
+        Project.objects.visible_to(user)
+        .order_by("-prediction_confidence", "-id")
+        .values_list("id", "public_id", "user__username", "prediction_confidence")[:limit]
+    )
+
+
+def report_month(request) -> Tuple[int, int]:
+    now = timezone.now()
+    try:
+        year = int(request.GET.get("year", now.year))
+        month = int(request.GET.get("month", now.month))
+    except ValueError:
+        raise ValueError("year and month must be numbers.")
+    if month_bounds(year, month) is None:
+        raise ValueError("Not a valid month.")
+    return year, month
+
+
+def report_queryset(year: int, month: int):
+    return Project.objects.created_in_month(year, month).for_listing()
+
+
+def detail_rows(user: CustomUser, pk: int):
+    return Project.objects.visible_to(user).filter(pk=pk).values_list(*DETAIL_FIELDS)
+
+
+def summary_payload(scope, summary: dict) -> dict:
+    return {
+        "scope": ProjectRollup.scope_for(scope),
+        "uploads": summary["uploads"],
+        "recent": summary["recent"],
+        "avg_confidence": _number(summary["avg_confidence"]),
+        "statistics": len(summary["idea_stats"]) if summary["idea_stats"] else 0,
+    }
+
+
+def ideas_payload(rows) -> dict:
+    return {
+        "ideas": [
+            {
+                "idea": row["idea"],
+                "uploads": row["total"],
+                "avg_confidence": round(row["avg_conf"], 2),
+            }
+            for row in rows
+        ]
+    }
+
+
+def confidence_payload(limit: int, rows) -> dict:
+    return {
+        "limit": limit,
+        "uploads": [
+            {
+                "id": pk,
+                "public_id": public_id,
+                "username": username,
+                "prediction_confidence": _number(confidence),
+            }
+            for pk, public_id, username, confidence in rows
+        ],
+    }
+
+
+def monthly_payload(year: int, month: int, totals, page) -> dict:
+    return {
+        "year": year,
+        "month": month,
+        "uploads": totals.uploads if totals else 0,
+        "avg_confidence": _number(totals.avg_confidence) if totals else None,
+        "results": [_upload(project) for project in page],
+        "next_cursor": page.next_cursor,
+    }
+
+
+def detail_payload(pk: int, row) -> dict:
+    fields = dict(zip(DETAIL_FIELDS, row))
+    thumbnail = fields.pop("thumbnail")
+    return {
+        "id": pk,
+        **fields,
+        "prediction_confidence": _number(fields["prediction_confidence"]),
+        "created_at": fields["created_at"].isoformat(),
+        "thumbnail_url": Project.thumbnail.field.storage.url(thumbnail) if thumbnail else None,
+    }
+
+
+def _scope_rollup(request) -> ProjectRollup:
+    # The ETag and Last-Modified callbacks share one lookup per request.
+    if not hasattr(request, "_api_rollup"):
+        request._api_rollup = rollups.summary_for(
+            None if is_admin(request.user) else request.user
+        )
+    return request._api_rollup
+
+
+def scope_etag(request, *args, **kwargs) -> str:
+    return rollup_etag(request, _scope_rollup(request))
+
+
+def summary_etag(request, *args, **kwargs) -> str:
+    return summary_etag_for(request, _scope_rollup(request))
+
+
+def scope_last_modified(request, *args, **kwargs):
+    return _scope_rollup(request).updated_at
+
+
+def summary_last_modified(request, *args, **kwargs):
+    return summary_last_modified_for(_scope_rollup(request))
+
+
+def _detail_row(request, pk: int):
+    if not hasattr(request, "_api_detail"):
+        request._api_detail = detail_rows(request.user, pk).first()
+    return request._api_detail
+
+
+def detail_etag(request, pk: int):
+    return detail_etag_for(pk, _detail_row(request, pk))
+
+
+def api_view(*validators):
+    """Authenticated, read-only, revalidated on every poll."""
+
+    def decorate(view):
+        view = condition(*validators)(view)
+        return api_login_required(
+            require_safe(cache_control(private=True, no_cache=True)(view))
+        )
+
+    return decorate
+
+
+@api_view(summary_etag, summary_last_modified)
+def summary_view(request):
+    scope = None if is_admin(request.user) else request.user
+    summary = caching.fragment("summary", scope, lambda: rollups.dashboard_summary(scope))
+    return JsonResponse(summary_payload(scope, summary))
+
+
+@api_admin_required
+@api_view(scope_etag, scope_last_modified)
+def idea_stats_view(request):
+    return JsonResponse(ideas_payload(rollups.idea_stats()))
+
+
+@api_view(scope_etag, scope_last_modified)
+def confidence_view(request):
+    try:
+        limit = confidence_limit(request)
+    except ValueError as exc:
+        return error_response(str(exc), 400)
+    return JsonResponse(confidence_payload(limit, confidence_rows(request.user, limit)))
+
+
+@api_admin_required
+@api_view(scope_etag, scope_last_modified)
+def monthly_report_view(request):
+    try:
+        year, month = report_month(request)
+        page = keyset_page(report_queryset(year, month), request.GET.get("cursor"))
+    except ValueError as exc:
+        return error_response(str(exc), 400)
+    totals = rollups.month_totals([year]).get((year, month))
+    return JsonResponse(monthly_payload(year, month, totals, page))
+
+
+@api_view(detail_etag)
+def upload_detail_view(request, pk):
+    # Uploads have no modification timestamp, so detail responses are
+    # validated by ETag alone.
+    row = _detail_row(request, pk)
+    if row is None:
+        return error_response("Upload not found.", 404)
+    return JsonResponse(detail_payload(pk, row))
+
+
+def _moment(value: Optional[str]):
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        parsed = parse_date(value)
+        moment = datetime.combine(parsed, datetime.min.time()) if parsed else None
+    if moment is None:
+        raise ValueError(f"{value!r} is not an ISO 8601 date or timestamp.")
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+@api_login_required
+@require_safe
+@cache_control(private=True, no_cache=True)
+def statistic_series_view(request, metric_name):
+    """
+    A metric's series from the statistic rollups: `?resolution=minute|hour|day`,
+    `upload=<id>` for one upload (omitted: all uploads, administrators only)
+    and optional `start` / `end` bounds.
+    """
+
+    resolution = request.GET.get("resolution", "hour")
+    try:
+        upload = int(request.GET["upload"]) if request.GET.get("upload") else None
+    except ValueError:
+        return error_response("upload must be an upload id.", 400)
+    if upload is not None:
+        if not Project.objects.visible_to(request.user).filter(pk=upload).exists():
+            return error_response("Upload not found.", 404)
+    elif not is_admin(request.user):
+        return error_response("Only administrators can read global series.", 403)
+    try:
+        points = timeseries.series(
+            metric_name,
+            project=upload,
+            resolution=resolution,
+            start=_moment(request.GET.get("start")),
+            end=_moment(request.GET.get("end")),
+        )
+    except ValueError as exc:
+        return error_response(str(exc), 400)
+    return JsonResponse(
+        {
+            "metric": metric_name,
+            "upload": upload,
+            "resolution": resolution,
+            "series": [
+                {
+                    "bucket": point["bucket"].isoformat(),
+                    "points": point["points"],
+                    "average": _number(point["average"]),
+                    "minimum": _number(point["minimum"]),
+                    "maximum": _number(point["maximum"]),
+                }
+                for point in points
+            ],
+        }
+    )
+
+
+# Async variants, routed instead of the views above when ASYNC_VIEWS is on.
+
+
+def async_api_view(*validators, admin: bool = False):
+    """`api_view` (plus `api_admin_required` with `admin=True`) for coroutine views."""
+
+    def decorate(view):
+        view = async_condition(*validators)(view)
+        view = async_require_safe(async_cache_control(private=True, no_cache=True)(view))
+
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            user = await authenticated_user(request)
+            if user is None:
+                return error_response("Authentication required.", 401)
+            if admin and not is_admin(user):
+                return error_response("Only administrators can use this endpoint.", 403)
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+async def _ascope_rollup(request) -> ProjectRollup:
+    if not hasattr(request, "_api_rollup"):
+        request._api_rollup = await rollups.asummary_for(
+            None if is_admin(request.user) else request.user
+        )
+    return request._api_rollup
+
+
+async def ascope_etag(request, *args, **kwargs) -> str:
+    return rollup_etag(request, await _ascope_rollup(request))
+
+
+async def asummary_etag(request, *args, **kwargs) -> str:
+    return summary_etag_for(request, await _ascope_rollup(request))
+
+
+async def ascope_last_modified(request, *args, **kwargs):
+    return (await _ascope_rollup(request)).updated_at
+
+
+async def asummary_last_modified(request, *args, **kwargs):
+    return summary_last_modified_for(await _ascope_rollup(request))
+
+
+async def _adetail_row(request, pk: int):
+    if not hasattr(request, "_api_detail"):
+        request._api_detail = await detail_rows(request.user, pk).afirst()
+    return request._api_detail
+
+
+async def adetail_etag(request, pk: int):
+    return detail_etag_for(pk, await _adetail_row(request, pk))
+
+
+@async_api_view(asummary_etag, asummary_last_modified)
+async def asummary_view(request):
+    scope = None if is_admin(request.user) else request.user
+    summary = await caching.afragment(
+        "summary", scope, lambda: rollups.adashboard_summary(scope)
+    )
+    return JsonResponse(summary_payload(scope, summary))
+
+
+@async_api_view(ascope_etag, ascope_last_modified, admin=True)
+async def aidea_stats_view(request):
+    return JsonResponse(ideas_payload(await rollups.aidea_stats()))
+
+
+@async_api_view(ascope_etag, ascope_last_modified)
+async def aconfidence_view(request):
+    try:
+        limit = confidence_limit(request)
+    except ValueError as exc:
+        return error_response(str(exc), 400)
+    rows = await alist(confidence_rows(request.user, limit))
+    return JsonResponse(confidence_payload(limit, rows))
+
+
+@async_api_view(ascope_etag, ascope_last_modified, admin=True)
+async def amonthly_report_view(request):
+    try:
+        year, month = report_month(request)
+        page, totals = await asyncio.gather(
+            akeyset_page(report_queryset(year, month), request.GET.get("cursor")),
+            rollups.amonth_totals([year]),
+        )
+    except ValueError as exc:
+        return error_response(str(exc), 400)
+    return JsonResponse(monthly_payload(year, month, totals.get((year, month)), page))
+
+
+@async_api_view(adetail_etag)
+async def aupload_detail_view(request, pk):
+    row = await _adetail_row(request, pk)
+    if row is None:
+        return error_response("Upload not found.", 404)
+    return JsonResponse(detail_payload(pk, row))
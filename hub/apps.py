@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class HubConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hub'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from . import search, signals  # noqa: F401
+
+        post_migrate.connect(search.install, sender=self)
@@ -0,0 +1,117 @@
+"""
+Helpers for the async variants of the read-only views.
+
+With `ASYNC_VIEWS=True` the URLconf routes the statistics and reports pages
+and the `/api/v1/` endpoints to their `a`-prefixed async versions, which read
+through the async ORM and gather independent queries with `asyncio.gather`.
+Served by an ASGI server (Gunicorn with uvicorn workers, see
+DEPLOYMENT_GUIDE.md), a request waiting on the database then no longer ties
+up a worker thread.
+
+Django 4.2 still runs each async query through `sync_to_async` on one thread
+per request, so gathered reads are issued back to back rather than in
+parallel: the gain is in how many slow requests a worker can hold open, not
+in the latency of a single request. `login_required`, `condition`,
+`require_safe` and `cache_control` only accept async views from Django 5.0,
+hence the equivalents below.
+"""
+
+import datetime
+import functools
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.http import HttpResponseNotAllowed
+from django.shortcuts import render, resolve_url
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.utils import timezone
+
+
+async def alist(queryset) -> list:
+    return [row async for row in queryset]
+
+
+async def authenticated_user(request):
+    """Resolve the lazy `request.user` off the event loop; None when anonymous."""
+
+    def load():
+        user = request.user
+        return user if user.is_authenticated else None
+
+    return await sync_to_async(load)()
+
+
+async def arender(request, template_name: str, context: dict):
+    # Templates may evaluate lazy querysets, so they render in a thread.
+    return await sync_to_async(render)(request, template_name, context)
+
+
+def async_login_required(login_url: str):
+    def decorate(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if await authenticated_user(request) is None:
+                return redirect_to_login(request.get_full_path(), resolve_url(login_url))
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def async_require_safe(view):
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return HttpResponseNotAllowed(["GET", "HEAD"])
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def async_cache_control(**directives):
+    def decorate(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            response = await view(request, *args, **kwargs)
+            patch_cache_control(response, **directives)
+            return response
+
+        return wrapper
+
+    return decorate
+
+
+def async_condition(etag_func=None, last_modified_func=None):
+    """`django.views.decorators.http.condition` for coroutine views and validators."""
+
+    def decorate(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            etag = await etag_func(request, *args, **kwargs) if etag_func else None
+            etag = quote_etag(etag) if etag is not None else None
+            last_modified = None
+            if last_modified_func:
+                moment = await last_modified_func(request, *args, **kwargs)
+                if moment:
+                    if not timezone.is_aware(moment):
+                        moment = timezone.make_aware(moment, datetime.timezone.utc)
+                    last_modified = int(moment.timestamp())
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = await view(request, *args, **kwargs)
+
+            if request.method in ("GET", "HEAD"):
+                if last_modified and not response.has_header("Last-Modified"):
+                    response.headers["Last-Modified"] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault("ETag", etag)
+            return response
+
+        return wrapper
+
+    return decorate
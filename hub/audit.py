@@ -0,0 +1,228 @@
+"""
+Buffered login audit log.
+
+`login_view` hands each successful login to `record()` instead of inserting
+a `UserLoginLog` row itself. Events collect in a per-process buffer and are
+written with one `bulk_create` once `LOGIN_AUDIT_BATCH_SIZE` have queued or
+`LOGIN_AUDIT_FLUSH_SECONDS` after the first one arrived, whichever comes
+first, so a burst of sign-ins costs a handful of INSERTs instead of one
+write per request. The buffer is also flushed when the process exits.
+
+If the database cannot take the batch (SQLite answering "database is
+locked" under a login storm, a failover, ...) the events are appended to the
+JSON Lines spool at `LOGIN_AUDIT_SPOOL` instead of being dropped. The next
+successful flush, or `prune_login_logs`, replays the spool. Events therefore
+reach the admin pages a few seconds late; set `LOGIN_AUDIT_BATCH_SIZE=1` to
+write every login immediately.
+
+`expired_months()` and `prune()` back the `prune_login_logs` command, which
+keeps `hub_userloginlog` within `LOGIN_LOG_RETENTION_DAYS`.
+"""
+
+import atexit
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import UserLoginLog
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_FLUSH_SECONDS = 5.0
+DEFAULT_RETENTION_DAYS = 180
+INSERT_BATCH = 1000
+DELETE_BATCH = 5000
+
+
+def batch_size() -> int:
+    return max(1, getattr(settings, "LOGIN_AUDIT_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+
+
+def flush_seconds() -> float:
+    return getattr(settings, "LOGIN_AUDIT_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS)
+
+
+def retention_days() -> int:
+    return getattr(settings, "LOGIN_LOG_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+
+
+def spool_path() -> Path:
+    return Path(getattr(settings, "LOGIN_AUDIT_SPOOL", Path(settings.BASE_DIR) / "logs" / "login_audit.jsonl"))
+
+
+def _event(user_id: int, ip_address: Optional[str], user_agent: str, login_time: datetime) -> Dict:
+    return {
+        "user_id": user_id,
+        "ip_address": ip_address or None,
+        "user_agent": user_agent or "",
+        "login_time": login_time.isoformat(),
+    }
+
+
+def _row(event: Dict) -> UserLoginLog:
+    login_time = parse_datetime(event["login_time"])
+    if login_time is None:
+        raise ValueError(f"Invalid login_time {event['login_time']!r}.")
+    return UserLoginLog(
+        user_id=event["user_id"],
+        ip_address=event["ip_address"],
+        user_agent=event["user_agent"],
+        login_time=login_time,
+    )
+
+
+def _rows(events: Iterable[Dict]) -> List[UserLoginLog]:
+    return [_row(event) for event in events]
+
+
+def _spill(events: List[Dict]) -> None:
+    path = spool_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # One write per batch in append mode, so lines from several workers
+    # never interleave.
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write("".join(json.dumps(event) + "\n" for event in events))
+
+
+def rejected_path() -> Path:
+    path = spool_path()
+    return path.with_name(f"{path.name}.rejected")
+
+
+def replay_spool() -> int:
+    """
+    Insert spooled events; returns how many were written. Lines that cannot
+    be parsed (a worker killed mid-write, a hand edit) are moved to
+    `rejected_path()` instead of holding the rest of the spool back.
+    """
+
+    path = spool_path()
+    claimed = path.with_name(f"{path.name}.{os.getpid()}.{uuid.uuid4().hex}")
+    try:
+        # Renaming claims the file, so two workers never replay it twice.
+        os.replace(path, claimed)
+    except FileNotFoundError:
+        return 0
+    events, rows, rejected = [], [], []
+    with open(claimed, encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+                rows.append(_row(event))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                rejected.append(line if line.endswith("\n") else line + "\n")
+            else:
+                events.append(event)
+    if rejected:
+        with open(rejected_path(), "a", encoding="utf-8") as handle:
+            handle.write("".join(rejected))
+    try:
+        with transaction.atomic():
+            UserLoginLog.objects.bulk_create(rows, batch_size=INSERT_BATCH)
+    except DatabaseError:
+        _spill(events)
+        return 0
+    finally:
+        claimed.unlink()
+    return len(events)
+
+
+class LoginAuditBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: List[Dict] = []
+        self._timer: Optional[threading.Timer] = None
+        self._pid = os.getpid()
+
+    def record(self, user, ip_address: Optional[str] = None, user_agent: str = "") -> None:
+        event = _event(user.pk, ip_address, user_agent, timezone.now())
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the parent's events and timer are not ours.
+                self._events, self._timer, self._pid = [], None, os.getpid()
+            self._events.append(event)
+            full = len(self._events) >= batch_size()
+            if not full and self._timer is None:
+                self._timer = threading.Timer(flush_seconds(), self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def _flush_from_timer(self) -> None:
+        try:
+            self.flush()
+        finally:
+            # Timer threads get their own connections; don't leak them.
+            connections.close_all()
+
+    def flush(self) -> int:
+        """Write buffered events now; returns how many reached the database."""
+
+        with self._lock:
+            events, self._events = self._events, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not events:
+            return 0
+        try:
+            with transaction.atomic():
+                UserLoginLog.objects.bulk_create(_rows(events), batch_size=INSERT_BATCH)
+        except DatabaseError:
+            _spill(events)
+            return 0
+        replay_spool()
+        return len(events)
+
+    def pending(self) -> int:
+        return len(self._events)
+
+
+buffer = LoginAuditBuffer()
+atexit.register(buffer.flush)
+
+
+def record(user, ip_address: Optional[str] = None, user_agent: str = "") -> None:
+    buffer.record(user, ip_address, user_agent)
+
+
+def flush() -> int:
+    return buffer.flush()
+
+
+def cutoff(days: Optional[int] = None, now: Optional[datetime] = None) -> datetime:
+    return (now or timezone.now()) - timedelta(days=retention_days() if days is None else days)
+
+
+def expired_months(before: datetime) -> List[Tuple[int, int]]:
+    """(year, month) of every calendar month with logins that ends on or before `before`."""
+
+    before = timezone.localtime(before)
+    return [
+        (start.year, start.month)
+        for start in UserLoginLog.objects.filter(login_time__lt=before).datetimes("login_time", "month")
+        if (start.year, start.month) < (before.year, before.month)
+    ]
+
+
+def prune(before: datetime) -> int:
+    """Delete login logs older than `before` in short transactions."""
+
+    stale = UserLoginLog.objects.filter(login_time__lt=before)
+    deleted = 0
+    while True:
+        pks = list(stale.order_by().values_list("pk", flat=True)[:DELETE_BATCH])
+        if not pks:
+            return deleted
+        deleted += UserLoginLog.objects.filter(pk__in=pks).delete()[0]
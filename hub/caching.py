@@ -0,0 +1,167 @@
+"""
+Cached dashboard summary fragments.
+
+The summary cards on the dashboard, statistics and profile pages (upload
+count, 7-day count, average confidence and, for administrators, the idea
+statistics) are stored in Django's cache under a per-scope key: `user:<id>`
+for contributors and `global` for administrators. Keys embed a generation
+token for their scope plus an "all" token. Saving or deleting an upload
+replaces its owner's token and the global token once the transaction
+commits, so stale fragments are never read again and simply expire.
+Anything that rewrites uploads in bulk calls `invalidate_all()`.
+
+Only `get`/`set`/`add`/`incr` are used, so any Django cache backend works,
+as long as every worker process shares it: the file-based cache by default,
+Redis in larger deployments. With locmem, a worker that saves an upload
+replaces only its own token and the others keep serving stale fragments.
+Hit and miss counters are kept in the same cache and reported by `stats()`.
+
+A fragment built while reads go to a replica (`hub.routers`) is returned
+but not stored, since the replica may not have caught up with the write that
+bumped the token yet.
+"""
+
+import asyncio
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from . import routers
+from .models import ProjectRollup
+
+PREFIX = "hub:fragment"
+ALL_SCOPES = "all"
+FRAGMENTS = ("summary",)
+DEFAULT_TIMEOUT = 300
+
+
+def _cache():
+    return caches[getattr(settings, "DASHBOARD_CACHE_ALIAS", "default")]
+
+
+def timeout() -> int:
+    return getattr(settings, "DASHBOARD_CACHE_TIMEOUT", DEFAULT_TIMEOUT)
+
+
+def _generation(scope: str) -> str:
+    key = f"{PREFIX}:generation:{scope}"
+    cache = _cache()
+    token = cache.get(key)
+    if token is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        token = cache.get(key)
+    return token
+
+
+async def _ageneration(scope: str) -> str:
+    key = f"{PREFIX}:generation:{scope}"
+    cache = _cache()
+    token = await cache.aget(key)
+    if token is None:
+        await cache.aadd(key, uuid.uuid4().hex, timeout=None)
+        token = await cache.aget(key)
+    return token
+
+
+def _bump(scope: str) -> None:
+    _cache().set(f"{PREFIX}:generation:{scope}", uuid.uuid4().hex, timeout=None)
+
+
+def _count(name: str, outcome: str) -> None:
+    cache = _cache()
+    key = f"{PREFIX}:stats:{name}:{outcome}"
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+async def _acount(name: str, outcome: str) -> None:
+    cache = _cache()
+    key = f"{PREFIX}:stats:{name}:{outcome}"
+    if not await cache.aadd(key, 1, timeout=None):
+        try:
+            await cache.aincr(key)
+        except ValueError:
+            await cache.aset(key, 1, timeout=None)
+
+
+def _key(name: str, scope: str, all_token: str, scope_token: str) -> str:
+    return f"{PREFIX}:{name}:{scope}:{all_token}:{scope_token}"
+
+
+def fragment(name: str, user=None, build: Optional[Callable[[], object]] = None):
+    """
+    The cached `name` fragment for a contributor's scope, or the global one
+    for `user=None`; on a miss `build()` computes and stores it.
+    """
+
+    scope = ProjectRollup.scope_for(user)
+    key = _key(name, scope, _generation(ALL_SCOPES), _generation(scope))
+    cache = _cache()
+    value = cache.get(key)
+    if value is not None:
+        _count(name, "hits")
+        return value
+    _count(name, "misses")
+    value = build()
+    if routers.current_replica() is None:
+        cache.set(key, value, timeout())
+    return value
+
+
+async def afragment(name: str, user=None, build: Optional[Callable[[], Awaitable]] = None):
+    """`fragment` for async views; `build` is a coroutine function."""
+
+    scope = ProjectRollup.scope_for(user)
+    tokens = await asyncio.gather(_ageneration(ALL_SCOPES), _ageneration(scope))
+    key = _key(name, scope, *tokens)
+    cache = _cache()
+    value = await cache.aget(key)
+    if value is not None:
+        await _acount(name, "hits")
+        return value
+    await _acount(name, "misses")
+    value = await build()
+    if routers.current_replica() is None:
+        await cache.aset(key, value, timeout())
+    return value
+
+
+def invalidate(user_id: int) -> None:
+    """Drop a contributor's fragments and the global ones after commit."""
+
+    def bump():
+        _bump(ProjectRollup.scope_for(user_id))
+        _bump(ProjectRollup.GLOBAL_SCOPE)
+
+    transaction.on_commit(bump)
+
+
+def invalidate_all() -> None:
+    transaction.on_commit(lambda: _bump(ALL_SCOPES))
+
+
+def stats() -> Dict[str, Dict[str, object]]:
+    cache = _cache()
+    report = {}
+    for name in FRAGMENTS:
+        hits = cache.get(f"{PREFIX}:stats:{name}:hits") or 0
+        misses = cache.get(f"{PREFIX}:stats:{name}:misses") or 0
+        total = hits + misses
+        report[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 3) if total else None,
+        }
+    return report
+
+
+def reset_stats() -> None:
+    _cache().delete_many(
+        [f"{PREFIX}:stats:{name}:{outcome}" for name in FRAGMENTS for outcome in ("hits", "misses")]
+    )
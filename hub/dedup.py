@@ -0,0 +1,141 @@
+"""
+Content-hash deduplication for repeated evidence.
+
+Every upload is fingerprinted with SHA-256: file bytes are hashed while the
+upload is streamed, links are hashed after URL normalization. A repeated
+fingerprint reuses the stored blob of the earlier upload and, once that
+upload has been scored, its verdict and confidence too, so neither the disk
+write nor the prediction job happens again. Scored lookups are memoized in a
+small per-process LRU cache with a TTL in front of the indexed DB lookup.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .models import Project
+
+CACHE_SIZE = 1024
+CACHE_TTL = 600
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid")
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_scored = TTLCache()
+
+
+def hash_file(uploaded_file) -> str:
+    precomputed = getattr(uploaded_file, "content_hash", None)
+    if precomputed:
+        return precomputed
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a link so trivially different URLs share a hash."""
+
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and str(parts.port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith(TRACKING_PARAMS)
+        )
+    )
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def hash_link(url: str) -> str:
+    return hashlib.sha256(f"link:{normalize_url(url)}".encode()).hexdigest()
+
+
+def fingerprint(project: Project, uploaded_file=None) -> str:
+    if project.file_type == "link":
+        return hash_link(project.link_url) if project.link_url else ""
+    if uploaded_file is not None:
+        return hash_file(uploaded_file)
+    return ""
+
+
+def lookup(content_hash: str) -> Optional[Dict[str, object]]:
+    """Stored file and, when available, the score of an earlier identical upload."""
+
+    if not content_hash:
+        return None
+    cached = _scored.get(content_hash)
+    if cached is not None:
+        return cached
+    earlier = (
+        Project.objects.filter(content_hash=content_hash)
+        .order_by("-created_at")
+        .values("file", "prediction_confidence", "verdict")
+    )
+    scored = earlier.exclude(verdict="Pending").first()
+    if scored is not None:
+        _scored.set(content_hash, scored)
+        return scored
+    return earlier.first()
+
+
+def apply_duplicate(project: Project, uploaded_file=None) -> bool:
+    """
+    Fingerprint `project` and reuse what an identical earlier upload produced.
+    Returns True when a cached score was applied and no prediction is needed.
+    """
+
+    project.content_hash = project.content_hash or fingerprint(project, uploaded_file)
+    earlier = lookup(project.content_hash)
+    if earlier is None:
+        return False
+    if project.file_type != "link" and earlier["file"]:
+        project.file = earlier["file"]
+    if earlier["verdict"] == "Pending":
+        return False
+    project.prediction_confidence = earlier["prediction_confidence"]
+    project.verdict = earlier["verdict"]
+    return True
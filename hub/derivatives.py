@@ -0,0 +1,119 @@
+"""
+Preview derivatives for uploaded evidence.
+
+Images are downscaled with Pillow; videos get a poster frame grabbed with
+`ffmpeg` when it is installed. Previews are WebP (JPEG where Pillow lacks
+WebP support) stored beside the original as `<name>.thumb.<ext>`. They are
+produced by the `run_derivatives` worker from "thumbnail" jobs queued when
+an upload is saved, never on the request path.
+"""
+
+import shutil
+import subprocess
+from io import BytesIO
+from pathlib import PurePosixPath
+from typing import Optional
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+from .models import Project
+
+THUMBNAIL_SIZE = (480, 480)
+POSTER_OFFSET = "00:00:01"
+FFMPEG_TIMEOUT = 60
+
+
+class DerivativeError(Exception):
+    pass
+
+
+def _format():
+    return ("WEBP", "webp") if features.check("webp") else ("JPEG", "jpg")
+
+
+def thumbnail_name(original: str) -> str:
+    path = PurePosixPath(original)
+    return str(path.with_name(f"{path.stem}.thumb.{_format()[1]}"))
+
+
+def _encode(image: Image.Image) -> bytes:
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(THUMBNAIL_SIZE)
+    image_format, _ = _format()
+    if image_format == "JPEG" or image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, image_format, quality=80)
+    return buffer.getvalue()
+
+
+def _image_preview(name: str) -> bytes:
+    with default_storage.open(name, "rb") as original:
+        with Image.open(original) as image:
+            image.draft("RGB", THUMBNAIL_SIZE)
+            return _encode(image)
+
+
+def _video_poster(name: str) -> Optional[bytes]:
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return None
+    command = [
+        ffmpeg, "-v", "error", "-ss", POSTER_OFFSET, "-i", default_storage.path(name),
+        "-frames:v", "1", "-f", "image2pipe", "-vcodec", "png", "-",
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, timeout=FFMPEG_TIMEOUT, check=True)
+    except (subprocess.SubprocessError, OSError) as exc:
+        raise DerivativeError(f"ffmpeg could not extract a poster frame: {exc}") from exc
+    if not result.stdout:
+        return None
+    with Image.open(BytesIO(result.stdout)) as frame:
+        return _encode(frame)
+
+
+def shared_thumbnail(project: Project) -> Optional[str]:
+    """
+    Deduplicated uploads share a blob, so they can share its preview too.
+    Matched on the indexed `content_hash`; `file` has no index.
+    """
+
+    if not project.file or not project.content_hash:
+        return None
+    return (
+        Project.objects.filter(content_hash=project.content_hash)
+        .exclude(thumbnail="")
+        .exclude(thumbnail__isnull=True)
+        .values_list("thumbnail", flat=True)
+        .first()
+    )
+
+
+def render(project: Project) -> Optional[str]:
+    """
+    Render and store the preview for `project`, returning its storage name, or
+    None when there is nothing to render (links, or videos without ffmpeg).
+    Touches storage only, so it is safe to run in worker threads.
+    """
+
+    if not project.file:
+        return None
+    original = project.file.name
+    try:
+        if project.file_type == "image":
+            content = _image_preview(original)
+        elif project.file_type == "video":
+            content = _video_poster(original)
+        else:
+            return None
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise DerivativeError(f"Could not render a preview of {original}: {exc}") from exc
+    if content is None:
+        return None
+    return default_storage.save(thumbnail_name(original), ContentFile(content))
+
+
+def generate(project: Project) -> Optional[str]:
+    return shared_thumbnail(project) or render(project)
@@ -48,14 +48,27 @@ class UploadForm(forms.ModelForm):
             "description": forms.Textarea(attrs={"rows": 3}),
         }
 
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_errors = upload_errors or {}
+
     def clean(self):
         cleaned = super().clean()
         file_type = cleaned.get("file_type")
         file = cleaned.get("file")
         link = cleaned.get("link_url")
 
+        for field, message in self.upload_errors.items():
+            self.add_error(field if field in self.fields else None, message)
+        if self.upload_errors:
+            return cleaned
+
         if file_type in {"image", "video"} and not file:
             raise forms.ValidationError("Please attach a file for image/video uploads.")
+        sniffed_kind = getattr(file, "sniffed_kind", file_type)
+        if file_type in {"image", "video"} and sniffed_kind != file_type:
+            self.add_error("file", f"The attached file is not a valid {file_type}.")
+            return cleaned
         if file_type == "link" and not link:
             raise forms.ValidationError("Please include the URL for link uploads.")
 
@@ -0,0 +1,224 @@
+"""
+Bulk loading of historical evidence for the `import_projects` command.
+
+Records are read lazily from JSON Lines or CSV, validated in a process pool
+by `validate()` (pure Python, no database access) and inserted in batches:
+one block of public IDs from `hub.public_ids`, one `bulk_create`, one
+`bulk_update` that restores the historical `created_at`, and one pass over the rollups, search index and job queue,
+none of which the bypassed `post_save` signal would otherwise update.
+"""
+
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import PurePosixPath
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import dedup, prediction, public_ids, rollups, search
+from .models import CustomUser, Project, ProjectJob
+
+FILE_TYPES = {choice for choice, _ in Project.FILE_TYPES}
+
+Record = Union[Dict[str, object], str]
+Validated = Tuple[int, Optional[Dict[str, object]], List[str]]
+
+
+def _jsonl_records(path: str) -> Iterator[Tuple[int, Record]]:
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield number, record if isinstance(record, dict) else line.rstrip("\n")
+
+
+def _csv_records(path: str) -> Iterator[Tuple[int, Record]]:
+    with open(path, newline="", encoding="utf-8") as handle:
+        reader = csv.DictReader(handle)
+        reader.fieldnames  # reads the header row
+        line = reader.line_num
+        for row in reader:
+            yield line + 1, {key: value for key, value in row.items() if value not in ("", None)}
+            line = reader.line_num
+
+
+def read_records(path: str, fmt: str) -> Iterator[Tuple[int, Record]]:
+    """
+    Yield (line number, record) pairs. JSON lines that do not decode to an
+    object come back as their raw text so `validate` can reject them.
+    """
+
+    return _csv_records(path) if fmt == "csv" else _jsonl_records(path)
+
+
+def batches(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _text(record: Dict[str, object], key: str) -> str:
+    value = record.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def validate(item: Tuple[int, Record]) -> Validated:
+    """Check and normalize one record; runs in the import worker pool."""
+
+    number, record = item
+    if not isinstance(record, dict):
+        return number, None, ["Not a JSON object."]
+
+    errors: List[str] = []
+    username = _text(record, "username") or _text(record, "user")
+    if not username:
+        errors.append("username is required.")
+
+    link_url = _text(record, "link_url")
+    file_name = _text(record, "file")
+    file_type = _text(record, "file_type") or ("link" if link_url else "")
+    if file_type not in FILE_TYPES:
+        errors.append(f"file_type must be one of {', '.join(sorted(FILE_TYPES))}.")
+    elif file_type == "link":
+        try:
+            URLValidator()(link_url)
+        except ValidationError:
+            errors.append("link_url must be a valid URL for link evidence.")
+    elif not file_name:
+        errors.append(f"file is required for {file_type} evidence.")
+
+    idea = _text(record, "idea") or link_url or PurePosixPath(file_name).name or "Untitled evidence"
+    if len(idea) > 255:
+        errors.append("idea must be at most 255 characters.")
+
+    confidence = None
+    if _text(record, "prediction_confidence"):
+        try:
+            confidence = rollups.as_decimal(Decimal(_text(record, "prediction_confidence")))
+        except InvalidOperation:
+            errors.append("prediction_confidence must be a number.")
+        else:
+            if not 0 <= confidence <= 100:
+                errors.append("prediction_confidence must be between 0 and 100.")
+    verdict = _text(record, "verdict")
+    if len(verdict) > 50:
+        errors.append("verdict must be at most 50 characters.")
+
+    created_at = timezone.now()
+    if _text(record, "created_at"):
+        try:
+            created_at = parse_datetime(_text(record, "created_at"))
+        except ValueError:
+            created_at = None
+        if created_at is None:
+            errors.append("created_at must be an ISO 8601 timestamp.")
+        elif timezone.is_naive(created_at):
+            created_at = timezone.make_aware(created_at)
+
+    file_size = 0
+    if _text(record, "file_size"):
+        try:
+            file_size = int(_text(record, "file_size"))
+        except ValueError:
+            errors.append("file_size must be a whole number of bytes.")
+        if file_size < 0:
+            errors.append("file_size must not be negative.")
+
+    if errors:
+        return number, None, errors
+    if not verdict:
+        verdict = "Pending" if confidence is None else prediction.verdict_for(float(confidence))
+    is_link = file_type == "link"
+    return number, {
+        "username": username,
+        "idea": idea,
+        "file_type": file_type,
+        "file": "" if is_link else file_name,
+        "link_url": link_url if is_link else "",
+        "description": _text(record, "description") if is_link else "",
+        "file_name": link_url if is_link else file_name,
+        "file_size": 0 if is_link else file_size,
+        "content_hash": dedup.hash_link(link_url) if is_link else _text(record, "content_hash"),
+        "prediction_confidence": confidence if confidence is not None else rollups.ZERO,
+        "verdict": verdict,
+        "created_at": created_at,
+    }, []
+
+
+class Importer:
+    """Resolves contributors and writes validated rows in batches."""
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+        self._users: Dict[str, int] = {}
+
+    def _resolve_users(self, usernames: Iterable[str]) -> None:
+        missing = set(usernames) - set(self._users)
+        if missing:
+            self._users.update(
+                CustomUser.objects.filter(username__in=missing).values_list("username", "id")
+            )
+
+    def load(self, validated: Iterable[Validated]) -> Tuple[int, List[Tuple[int, List[str]]]]:
+        """Insert the valid rows; returns the count and the (line, errors) rejections."""
+
+        rows = []
+        rejected: List[Tuple[int, List[str]]] = []
+        for number, cleaned, errors in validated:
+            if cleaned is None:
+                rejected.append((number, errors))
+            else:
+                rows.append((number, cleaned))
+        self._resolve_users(cleaned["username"] for _, cleaned in rows)
+
+        projects = []
+        for number, cleaned in rows:
+            user_id = self._users.get(cleaned["username"])
+            if user_id is None:
+                rejected.append((number, [f"Unknown username {cleaned['username']!r}."]))
+                continue
+            fields = dict(cleaned)
+            del fields["username"]
+            projects.append(Project(user_id=user_id, **fields))
+        if projects:
+            self._insert(projects)
+        return len(projects), rejected
+
+    def _insert(self, projects: List[Project]) -> None:
+        created_at = [project.created_at for project in projects]
+        with transaction.atomic():
+            for project, public_id in zip(projects, public_ids.allocate(len(projects))):
+                project.public_id = public_id
+            # auto_now_add stamps created_at on insert, so the historical
+            # values are written back in a single batched UPDATE.
+            Project.objects.bulk_create(projects, batch_size=self.batch_size)
+            for project, timestamp in zip(projects, created_at):
+                project.created_at = timestamp
+            Project.objects.bulk_update(projects, ["created_at"], batch_size=self.batch_size)
+            rollups.record_many(projects)
+            search.backend().index(
+                search.document(project.pk, project.idea, project.public_id, project.file_name)
+                for project in projects
+            )
+            now = timezone.now()
+            ProjectJob.objects.bulk_create(
+                (
+                    ProjectJob(project=project, kind="predict", available_at=now)
+                    for project in projects
+                    if project.verdict == "Pending"
+                ),
+                batch_size=self.batch_size,
+            )
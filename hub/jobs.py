@@ -0,0 +1,181 @@
+"""
+Database-backed queue for work on uploads outside the request cycle:
+prediction scoring ("predict") and preview generation ("thumbnail", see
+`hub.derivatives` and the `run_derivatives` command).
+
+`dashboard_view` saves the upload as "Pending" and calls `enqueue_prediction`.
+The `run_predictors` management command then repeatedly:
+
+1. claims a batch with `claim()`, marking the rows `running` until a
+   visibility deadline so a crashed worker's jobs are picked up again;
+2. scores the batch in a process pool with the configured
+   `hub.prediction` backend (`score_payloads`);
+3. writes confidences back with `complete()` or schedules a retry with
+   `fail()`, giving up after `max_attempts`.
+"""
+
+import os
+import socket
+import uuid
+from datetime import timedelta
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import caching, prediction, rollups
+from .models import Project, ProjectJob
+
+DEFAULT_VISIBILITY_TIMEOUT = 300
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 5
+
+
+def enqueue(project: Project, kind: str) -> ProjectJob:
+    """Queue (or re-queue) a `kind` job for `project`."""
+
+    job, _ = ProjectJob.objects.update_or_create(
+        project=project,
+        kind=kind,
+        defaults={
+            "status": "queued",
+            "attempts": 0,
+            "available_at": timezone.now(),
+            "locked_until": None,
+            "claimed_by": "",
+            "last_error": "",
+        },
+    )
+    return job
+
+
+def enqueue_prediction(project: Project) -> ProjectJob:
+    return enqueue(project, "predict")
+
+
+def _claimable(kind: str, now):
+    return ProjectJob.objects.filter(kind=kind).filter(
+        Q(status="queued", available_at__lte=now)
+        | Q(status="running", locked_until__lt=now)
+    )
+
+
+def claim(
+    kind: str = "predict",
+    batch_size: int = 50,
+    visibility_timeout: int = DEFAULT_VISIBILITY_TIMEOUT,
+) -> List[ProjectJob]:
+    """Claim up to `batch_size` jobs for this worker."""
+
+    now = timezone.now()
+    token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    with transaction.atomic():
+        candidates = list(
+            _claimable(kind, now)
+            .select_for_update(skip_locked=True)
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not candidates:
+            return []
+        # Re-check the claim condition in the UPDATE itself so two workers that
+        # picked the same candidates cannot both take them.
+        _claimable(kind, now).filter(pk__in=candidates).update(
+            status="running",
+            attempts=F("attempts") + 1,
+            locked_until=now + timedelta(seconds=visibility_timeout),
+            claimed_by=token,
+        )
+    return list(
+        ProjectJob.objects.filter(claimed_by=token, status="running").select_related("project")
+    )
+
+
+def payload_for(project: Project) -> Dict[str, str]:
+    return {
+        "idea": project.idea,
+        "description": project.description or "",
+        "file_type": project.file_type,
+    }
+
+
+def score_payloads(payloads: List[Dict[str, str]]) -> List[float]:
+    """Score a slice of payloads; runs inside the worker's process pool."""
+
+    return prediction.predict_batch(payloads)
+
+
+def complete(job: ProjectJob, confidence: float) -> bool:
+    """
+    Store the score on the upload and mark the job done. Returns False, and
+    changes nothing, when this worker no longer holds the claim.
+    """
+
+    project = job.project
+    confidence = rollups.as_decimal(confidence)
+    with transaction.atomic():
+        # Claim first: a job re-claimed after its visibility timeout would
+        # otherwise have its score recorded in the rollups twice.
+        if not mark_done(job):
+            return False
+        stored = (
+            Project.objects.filter(pk=project.pk)
+            .values_list("verdict", "prediction_confidence", "created_at")
+            .first()
+        )
+        if stored is None:
+            ProjectJob.objects.filter(pk=job.pk).delete()
+            return False
+        verdict, previous, created_at = stored
+        Project.objects.filter(pk=project.pk).update(
+            prediction_confidence=confidence,
+            verdict=prediction.verdict_for(confidence),
+        )
+        # A pending upload joins the averages only now that it has a score.
+        was_scored, was_confidence = rollups.contribution(verdict, previous)
+        rollups.record(
+            project.user_id,
+            project.idea,
+            0,
+            confidence - was_confidence,
+            rollups.month_of(created_at),
+            1 - was_scored,
+        )
+        caching.invalidate(project.user_id)
+    return True
+
+
+def mark_done(job: ProjectJob) -> bool:
+    """Finish a job this worker still holds; False when it lost the claim."""
+
+    return bool(
+        ProjectJob.objects.filter(pk=job.pk, claimed_by=job.claimed_by, status="running").update(
+            status="done",
+            locked_until=None,
+            last_error="",
+        )
+    )
+
+
+def fail(job: ProjectJob, error: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> None:
+    """Schedule a retry with exponential backoff, or give up after `max_attempts`."""
+
+    if job.attempts >= max_attempts:
+        changes = {"status": "failed"}
+    else:
+        delay = RETRY_BASE_DELAY * (2 ** (job.attempts - 1))
+        changes = {
+            "status": "queued",
+            "available_at": timezone.now() + timedelta(seconds=delay),
+        }
+    ProjectJob.objects.filter(pk=job.pk, claimed_by=job.claimed_by).update(
+        locked_until=None,
+        last_error=error[:2000],
+        **changes,
+    )
+
+
+def chunked(items: List, parts: int) -> Iterable[List]:
+    size = max(1, -(-len(items) // max(1, parts)))
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from hub import timeseries
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete raw statistic points and finer rollups older than STATISTIC_RETENTION_DAYS; '
+        'their minute/hour/day rollups keep the trend'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted.')
+
+    def handle(self, *args, **options):
+        retention = timeseries.retention()
+        if options['dry_run']:
+            for level, queryset in timeseries.expired().items():
+                self.stdout.write(f'{level}: {queryset.count()} row(s) older than {retention[level]} day(s)')
+            return
+        deleted = timeseries.downsample()
+        summary = ', '.join(f'{count} {level}' for level, count in deleted.items()) or 'nothing'
+        self.stdout.write(self.style.SUCCESS(f'Deleted {summary}.'))
@@ -0,0 +1,55 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hub import exports
+
+
+class Command(BaseCommand):
+    help = 'Stream uploads, statistics or login logs to a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(exports.DATASETS))
+        parser.add_argument('--format', choices=sorted(exports.FORMATS), default='csv')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip.')
+        parser.add_argument('--year', type=int)
+        parser.add_argument('--month', type=int)
+        parser.add_argument('--user', help='Only rows belonging to this username.')
+        parser.add_argument(
+            '--output',
+            help='File to write; defaults to a generated name in the current directory, "-" for stdout.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            exports.check_month(options['year'], options['month'])
+        except ValueError as exc:
+            raise CommandError(f'--year and --month: {exc}')
+        dataset = exports.DATASETS[options['dataset']]
+        filters = {
+            'year': options['year'],
+            'month': options['month'],
+            'username': options['user'],
+        }
+        output = options['output'] or exports.filename(
+            dataset, options['format'], options['gzip'], **filters
+        )
+        chunks = exports.stream(dataset, options['format'], options['gzip'], **filters)
+
+        started = time.monotonic()
+        written = 0
+        if output == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+                written += len(chunk)
+            sys.stdout.buffer.flush()
+            return
+        with open(output, 'wb') as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+                written += len(chunk)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} byte(s) of {dataset.name} to {output} in {elapsed:.2f}s'
+        ))
@@ -0,0 +1,93 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from hub import imports
+
+
+class Command(BaseCommand):
+    help = 'Bulk import historical evidence and predictions from a JSON Lines or CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format',
+            choices=('jsonl', 'csv'),
+            help='Input format; guessed from the file extension when omitted.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Validation processes; 0 validates in this process.',
+        )
+        parser.add_argument(
+            '--rejects',
+            help='Where to write rejected rows (default: <path>.rejected.jsonl).',
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.is_file():
+            raise CommandError(f'{path} does not exist.')
+        fmt = options['format'] or ('csv' if path.suffix.lower() == '.csv' else 'jsonl')
+        batch_size = max(1, options['batch_size'])
+        rejects_path = Path(options['rejects'] or f'{path}.rejected.jsonl')
+        importer = imports.Importer(batch_size)
+        self.verbosity = options['verbosity']
+
+        self.imported = self.rejected = 0
+        self.rejects = None
+        started = time.monotonic()
+        batches = imports.batches(imports.read_records(str(path), fmt), batch_size)
+        try:
+            if options['workers'] > 0:
+                # Validation of the next batch overlaps the insert of the current one.
+                with ProcessPoolExecutor(options['workers'], initializer=django.setup) as pool:
+                    chunksize = max(1, batch_size // options['workers'])
+                    ahead = deque()
+                    for batch in batches:
+                        ahead.append((batch, pool.map(imports.validate, batch, chunksize=chunksize)))
+                        if len(ahead) > 1:
+                            self._load(importer, *ahead.popleft(), rejects_path, started)
+                    while ahead:
+                        self._load(importer, *ahead.popleft(), rejects_path, started)
+            else:
+                for batch in batches:
+                    self._load(importer, batch, map(imports.validate, batch), rejects_path, started)
+        finally:
+            if self.rejects is not None:
+                self.rejects.close()
+
+        elapsed = time.monotonic() - started
+        rate = self.imported / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.imported} upload(s), rejected {self.rejected}, '
+            f'in {elapsed:.2f}s ({rate:.0f} rows/s)'
+        ))
+        if self.rejected:
+            self.stdout.write(f'Rejected rows were written to {rejects_path}')
+
+    def _load(self, importer, batch, validated, rejects_path, started):
+        imported, rejected = importer.load(validated)
+        self.imported += imported
+        self.rejected += len(rejected)
+        if rejected:
+            if self.rejects is None:
+                self.rejects = open(rejects_path, 'w', encoding='utf-8')
+            records = dict(batch)
+            for number, errors in sorted(rejected):
+                self.rejects.write(json.dumps(
+                    {'line': number, 'errors': errors, 'record': records.get(number)},
+                    ensure_ascii=False,
+                ) + '\n')
+        if self.verbosity >= 2:
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'{self.imported + self.rejected} row(s) processed in {elapsed:.2f}s')
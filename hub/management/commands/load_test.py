@@ -0,0 +1,132 @@
+import json
+import math
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+
+from hub.models import CustomUser
+
+DEFAULT_PATHS = ['/api/v1/summary/', '/api/v1/confidence/', '/statistics/', '/reports/']
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+
+    if not values:
+        return None
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure p50/p95/p99 latency of the read-only views on a running server. '
+        'Run it once against the sync deployment with --output, then against the '
+        'ASYNC_VIEWS/uvicorn deployment with --baseline to compare.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the server')
+        parser.add_argument('--path', action='append', dest='paths', help='Path to request (repeatable)')
+        parser.add_argument('--user', required=True, help='Username to sign the requests in as')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per path')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--baseline', help='JSON results of an earlier run to compare p95 against')
+
+    def _session_cookie(self, username):
+        # The command shares the server's database, so it can mint a session
+        # directly instead of scripting the login form.
+        try:
+            user = CustomUser.objects.get(username=username)
+        except CustomUser.DoesNotExist:
+            raise CommandError(f'No user named {username!r}.')
+        store = import_module(settings.SESSION_ENGINE).SessionStore()
+        store[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        store[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        store.create()
+        return store
+
+    def _fetch(self, url, cookie, timeout):
+        request = urllib.request.Request(url, headers={'Cookie': cookie})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                ok = response.status == 200
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return time.perf_counter() - started, ok
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or DEFAULT_PATHS
+        base = options['url'].rstrip('/')
+        session = self._session_cookie(options['user'])
+        cookie = f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+        jobs = [path for _ in range(options['requests']) for path in paths]
+
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                outcomes = list(
+                    pool.map(
+                        lambda path: (path, *self._fetch(base + path, cookie, options['timeout'])),
+                        jobs,
+                    )
+                )
+        finally:
+            session.delete()
+        elapsed = time.perf_counter() - started
+
+        results = {}
+        for path in paths:
+            latencies = sorted(seconds for name, seconds, ok in outcomes if name == path and ok)
+            results[path] = {
+                'requests': sum(1 for name, _, _ in outcomes if name == path),
+                'errors': sum(1 for name, _, ok in outcomes if name == path and not ok),
+                'p50_ms': self._ms(percentile(latencies, 50)),
+                'p95_ms': self._ms(percentile(latencies, 95)),
+                'p99_ms': self._ms(percentile(latencies, 99)),
+            }
+
+        baseline = {}
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as handle:
+                baseline = json.load(handle).get('paths', {})
+
+        for path, row in results.items():
+            line = (
+                f"{path}: {row['requests']} requests, {row['errors']} errors, "
+                f"p50 {row['p50_ms']} ms, p95 {row['p95_ms']} ms, p99 {row['p99_ms']} ms"
+            )
+            before = baseline.get(path, {}).get('p95_ms')
+            if before and row['p95_ms'] is not None:
+                line += f" (baseline p95 {before} ms, {(row['p95_ms'] - before) / before:+.0%})"
+            self.stdout.write(line)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump(
+                    {
+                        'url': base,
+                        'concurrency': options['concurrency'],
+                        'elapsed_s': round(elapsed, 3),
+                        'paths': results,
+                    },
+                    handle,
+                    indent=2,
+                )
+        self.stdout.write(
+            self.style.SUCCESS(f'Sent {len(outcomes)} request(s) in {elapsed:.2f}s ({len(outcomes) / elapsed:.0f} req/s)')
+        )
+
+    @staticmethod
+    def _ms(seconds):
+        return None if seconds is None else round(seconds * 1000, 1)
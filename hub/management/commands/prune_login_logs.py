@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from hub import audit, exports
+from hub.models import UserLoginLog, month_bounds
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay spooled login events and delete login logs older than LOGIN_LOG_RETENTION_DAYS, '
+        'optionally archiving each expired month to a gzipped JSON Lines file first'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Days of login history to keep (default: LOGIN_LOG_RETENTION_DAYS).')
+        parser.add_argument(
+            '--archive-dir',
+            help='Write each expired calendar month to logins-YYYY-MM.jsonl.gz here before deleting it. '
+            'Only whole months are pruned in this mode.',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted.')
+
+    def handle(self, *args, **options):
+        before = audit.cutoff(options['days'])
+        months = audit.expired_months(before) if options['archive_dir'] else []
+
+        if options['dry_run']:
+            if options['archive_dir']:
+                limit = month_bounds(*months[-1])[1] if months else None
+            else:
+                limit = before
+            count = UserLoginLog.objects.filter(login_time__lt=limit).count() if limit else 0
+            self.stdout.write(f'{count} login log(s) would be deleted.')
+            return
+
+        replayed = audit.replay_spool()
+        if replayed:
+            self.stdout.write(f'Replayed {replayed} spooled login event(s).')
+
+        if not options['archive_dir']:
+            deleted = audit.prune(before)
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} login log(s) older than {before:%Y-%m-%d}.'))
+            return
+
+        directory = Path(options['archive_dir'])
+        directory.mkdir(parents=True, exist_ok=True)
+        dataset = exports.DATASETS['logins']
+        deleted = 0
+        for year, month in months:
+            target = directory / exports.filename(dataset, 'jsonl', True, year, month)
+            # Months are archived oldest first and deleted only once written,
+            # so an interrupted run can simply be repeated.
+            with open(target, 'wb') as handle:
+                for chunk in exports.stream(dataset, 'jsonl', True, year, month):
+                    handle.write(chunk)
+            deleted += audit.prune(month_bounds(year, month)[1])
+            self.stdout.write(f'Archived {year}-{month:02d} to {target}')
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} archived login log(s).'))
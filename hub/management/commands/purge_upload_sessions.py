@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from hub import resumable
+from hub.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = 'Delete resumable uploads that were abandoned before being finalized'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Age of an untouched session before it is purged.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = UploadSession.objects.filter(status='open', updated_at__lt=cutoff)
+        purged = 0
+        for session in stale.iterator():
+            resumable.discard(session)
+            purged += 1
+        stale.delete()
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} abandoned upload session(s).'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from hub import rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the dashboard rollup tables from hub_upload, or check them for drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only compare the rollups against a fresh aggregation; exit non-zero on drift.',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Maximum number of drifted rows to print with --check.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drift = rollups.find_drift()
+            if not drift:
+                self.stdout.write(self.style.SUCCESS('Rollups match hub_upload.'))
+                return
+            for line in drift[:options['limit']]:
+                self.stdout.write(line)
+            raise CommandError(f'{len(drift)} rollup row(s) drifted; run rebuild_rollups to repair.')
+
+        scopes, ideas, months = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {scopes} scope rollup(s), {ideas} idea rollup(s) and {months} month rollup(s).'
+        ))
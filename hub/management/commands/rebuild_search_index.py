@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from hub import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for the dashboard search box from hub_upload'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options['database']
+        backend = search.backend(using)
+        if type(backend) is search.LikeSearchBackend:
+            self.stdout.write('This database has no search index; searches use substring matching.')
+            return
+        started = time.monotonic()
+        with transaction.atomic(using=using):
+            total = backend.rebuild()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} upload(s) in {elapsed:.2f}s'))
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from hub import prediction, rollups
+from hub.jobs import payload_for
+from hub.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Re-score every upload with the configured prediction backend in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--backend',
+            help='Registry name or dotted path overriding PREDICTION_BACKEND for this run.',
+        )
+
+    def handle(self, *args, **options):
+        backend = prediction.get_backend(options['backend'])
+        batch_size = options['batch_size']
+        started = time.monotonic()
+        total = 0
+        batch = []
+        queryset = Project.objects.order_by().only('id', 'idea', 'description', 'file_type')
+        for project in queryset.iterator(chunk_size=batch_size):
+            batch.append(project)
+            if len(batch) >= batch_size:
+                total += self._rescore(backend, batch)
+                batch = []
+        if batch:
+            total += self._rescore(backend, batch)
+
+        rollups.rebuild()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Re-scored {total} upload(s) with {backend.name or type(backend).__name__} '
+            f'in {elapsed:.2f}s'
+        ))
+
+    def _rescore(self, backend, batch):
+        confidences = backend.predict_batch([payload_for(project) for project in batch])
+        for project, confidence in zip(batch, confidences):
+            project.prediction_confidence = rollups.as_decimal(confidence)
+            project.verdict = prediction.verdict_for(confidence)
+        with transaction.atomic():
+            Project.objects.bulk_update(batch, ['prediction_confidence', 'verdict'], batch_size=500)
+        return len(batch)
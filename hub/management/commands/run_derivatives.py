@@ -0,0 +1,60 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from hub import derivatives, jobs
+from hub.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnails and video poster frames for queued uploads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--visibility-timeout', type=int, default=jobs.DEFAULT_VISIBILITY_TIMEOUT)
+        parser.add_argument('--max-attempts', type=int, default=jobs.DEFAULT_MAX_ATTEMPTS)
+        parser.add_argument('--poll-interval', type=float, default=2.0)
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit.')
+
+    def handle(self, *args, **options):
+        # Pillow and ffmpeg release the GIL while decoding and resizing, so
+        # threads are enough; they only touch storage, never the database.
+        with ThreadPoolExecutor(max_workers=max(1, options['threads'])) as pool:
+            while True:
+                close_old_connections()
+                claimed = jobs.claim(
+                    kind='thumbnail',
+                    batch_size=options['batch_size'],
+                    visibility_timeout=options['visibility_timeout'],
+                )
+                if claimed:
+                    self._run_batch(pool, claimed, options['max_attempts'])
+                    continue
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+
+    def _run_batch(self, pool, claimed, max_attempts):
+        started = time.monotonic()
+        shared = {job.pk: derivatives.shared_thumbnail(job.project) for job in claimed}
+        futures = [
+            (job, None if shared[job.pk] else pool.submit(derivatives.render, job.project))
+            for job in claimed
+        ]
+        rendered = failed = 0
+        for job, future in futures:
+            try:
+                name = shared[job.pk] or future.result()
+            except derivatives.DerivativeError as exc:
+                jobs.fail(job, str(exc), max_attempts)
+                failed += 1
+                continue
+            if name:
+                Project.objects.filter(pk=job.project_id).update(thumbnail=name)
+                rendered += 1
+            jobs.mark_done(job)
+        elapsed = time.monotonic() - started
+        self.stdout.write(f'Rendered {rendered} preview(s), {failed} failed, in {elapsed:.2f}s')
@@ -0,0 +1,64 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from hub import jobs, prediction
+
+
+class Command(BaseCommand):
+    help = 'Score queued uploads in batches using a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            '--visibility-timeout',
+            type=int,
+            default=jobs.DEFAULT_VISIBILITY_TIMEOUT,
+            help='Seconds a claimed job stays invisible to other workers.',
+        )
+        parser.add_argument('--max-attempts', type=int, default=jobs.DEFAULT_MAX_ATTEMPTS)
+        parser.add_argument('--poll-interval', type=float, default=2.0)
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit.')
+
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+        # Each pool process loads the configured backend once, before its first batch.
+        with ProcessPoolExecutor(max_workers=processes, initializer=prediction.get_backend) as pool:
+            while True:
+                close_old_connections()
+                claimed = jobs.claim(
+                    batch_size=options['batch_size'],
+                    visibility_timeout=options['visibility_timeout'],
+                )
+                if claimed:
+                    self._run_batch(pool, claimed, processes, options['max_attempts'])
+                    continue
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+
+    def _run_batch(self, pool, claimed, processes, max_attempts):
+        started = time.monotonic()
+        slices = list(jobs.chunked(claimed, processes))
+        futures = [
+            pool.submit(jobs.score_payloads, [jobs.payload_for(job.project) for job in batch])
+            for batch in slices
+        ]
+        scored = failed = 0
+        for batch, future in zip(slices, futures):
+            try:
+                confidences = future.result()
+            except Exception as exc:  # a crashed slice is retried as a whole
+                for job in batch:
+                    jobs.fail(job, repr(exc), max_attempts)
+                failed += len(batch)
+                continue
+            for job, confidence in zip(batch, confidences):
+                # A job re-claimed by another worker meanwhile is theirs to record.
+                scored += jobs.complete(job, confidence)
+        elapsed = time.monotonic() - started
+        self.stdout.write(f'Scored {scored} upload(s), {failed} failed, in {elapsed:.2f}s')
@@ -0,0 +1,93 @@
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+BACKENDS = {
+    'stock': {'ENGINE': 'django.db.backends.sqlite3', 'OPTIONS': {}},
+    'tuned': {'ENGINE': 'hub.sqlite', 'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 5}},
+}
+
+
+def _work(args):
+    # Mirrors an upload: check for an existing row, then insert, in one
+    # transaction. Under the stock backend the read takes a shared lock that
+    # must be upgraded for the write; that upgrade is what fails with
+    # "database is locked".
+    alias, worker, transactions = args
+    committed = locked = 0
+    started = time.perf_counter()
+    for number in range(transactions):
+        try:
+            with transaction.atomic(using=alias):
+                with connections[alias].cursor() as cursor:
+                    cursor.execute('SELECT COUNT(*) FROM bench WHERE worker = %s', [worker])
+                    cursor.fetchone()
+                    cursor.execute(
+                        'INSERT INTO bench (worker, payload) VALUES (%s, %s)',
+                        [worker, f'{worker}:{number}' * 8],
+                    )
+            committed += 1
+        except OperationalError:
+            locked += 1
+    elapsed = time.perf_counter() - started
+    connections[alias].close()
+    return committed, locked, elapsed
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare write throughput of the stock SQLite backend and hub.sqlite with several '
+        'processes writing to one database file at once'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent writer processes.')
+        parser.add_argument('--transactions', type=int, default=300, help='Write transactions per worker.')
+        parser.add_argument('--backend', action='append', choices=sorted(BACKENDS), dest='backends')
+
+    def _configure(self, alias, name, path):
+        connections.settings[alias] = connections.configure_settings(
+            {
+                DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+                alias: {**BACKENDS[name], 'NAME': str(path)},
+            }
+        )[alias]
+        with connections[alias].cursor() as cursor:
+            cursor.execute('CREATE TABLE bench (id INTEGER PRIMARY KEY, worker INTEGER, payload TEXT)')
+            cursor.execute('CREATE INDEX bench_worker ON bench (worker)')
+        connections.close_all()
+
+    def _run(self, name, directory, workers, transactions):
+        alias = f'benchmark_{name}'
+        self._configure(alias, name, Path(directory) / f'{name}.sqlite3')
+        started = time.perf_counter()
+        try:
+            with multiprocessing.get_context('fork').Pool(workers) as pool:
+                results = pool.map(_work, [(alias, worker, transactions) for worker in range(workers)])
+        finally:
+            del connections[alias]
+            del connections.settings[alias]
+        elapsed = time.perf_counter() - started
+        committed = sum(result[0] for result in results)
+        locked = sum(result[1] for result in results)
+        return {'committed': committed, 'locked': locked, 'elapsed': elapsed, 'rate': committed / elapsed}
+
+    def handle(self, *args, **options):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError('The benchmark forks its workers and needs a platform that supports fork().')
+        names = options['backends'] or ['stock', 'tuned']
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for name in names:
+                results[name] = row = self._run(name, directory, options['workers'], options['transactions'])
+                self.stdout.write(
+                    f"{name}: {row['committed']} committed, {row['locked']} failed with "
+                    f"'database is locked', {row['elapsed']:.2f}s, {row['rate']:.0f} commits/s"
+                )
+        if 'stock' in results and 'tuned' in results and results['stock']['rate']:
+            gain = results['tuned']['rate'] / results['stock']['rate']
+            self.stdout.write(self.style.SUCCESS(f'hub.sqlite commits {gain:.1f}x as many transactions per second.'))
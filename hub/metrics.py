@@ -0,0 +1,259 @@
+"""
+Per-view request metrics.
+
+`hub.middleware.RequestMetricsMiddleware` times every request and files it
+under its URL name (`resolver_match.view_name`) and method. It records:
+
+- wall time;
+- time spent in SQL and the number of queries, counted by a wrapper that
+  `connection_created` installs on every database connection;
+- template render time, through the `TimedDjangoTemplates` backend;
+- response size.
+
+The numbers go into in-process histograms served in the Prometheus text
+format at `/metrics/`. With `METRICS_SERVER_TIMING` on, administrators also
+get the request's own numbers in a `Server-Timing` header that browser dev
+tools display. Per-request state
+lives in a context variable, so queries that async views run in
+`sync_to_async` threads are still counted. Recording costs a few
+`perf_counter()` calls and one lock per request.
+
+Histograms are per process: with several Gunicorn workers each scrape sees
+the worker that answered it. Scrape each worker separately, or treat the
+numbers as a sample.
+"""
+
+import bisect
+import contextvars
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template.exceptions import TemplateDoesNotExist
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+UNMATCHED = "<unmatched>"
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+HISTOGRAMS = (
+    ("hub_request_duration_seconds", "Wall time of a request.", TIME_BUCKETS),
+    ("hub_request_db_seconds", "Time a request spent executing SQL.", TIME_BUCKETS),
+    ("hub_request_queries", "SQL queries issued by a request.", QUERY_BUCKETS),
+    ("hub_request_template_seconds", "Time a request spent rendering templates.", TIME_BUCKETS),
+    ("hub_response_size_bytes", "Size of non-streaming response bodies.", SIZE_BUCKETS),
+)
+
+
+class RequestStats:
+    __slots__ = ("started", "queries", "db", "templates")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.templates = 0.0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("hub_request_metrics", default=None)
+
+
+def start() -> Tuple[RequestStats, contextvars.Token]:
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def finish(token: contextvars.Token) -> None:
+    _current.reset(token)
+
+
+def current() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def enabled() -> bool:
+    return getattr(settings, "METRICS_ENABLED", True)
+
+
+def _observe_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db += time.perf_counter() - started
+        stats.queries += 1
+
+
+def install_query_observer(sender=None, connection=None, **kwargs) -> None:
+    """Connected to `connection_created`: count and time queries on `connection`."""
+
+    if _observe_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_observe_query)
+
+
+connection_created.connect(install_query_observer, dispatch_uid="hub.metrics.install_query_observer")
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.templates += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing each render for the current request."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        running = 0
+        for bound, count in zip(self.bounds, self.counts):
+            running += count
+            yield _number(bound), running
+        yield "+Inf", running + self.counts[-1]
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series: Dict[Tuple[str, str], List[Histogram]] = {}
+            self._responses: Dict[Tuple[str, str, str], int] = {}
+            self.started = time.time()
+
+    def observe(
+        self,
+        view: str,
+        method: str,
+        status: int,
+        stats: RequestStats,
+        elapsed: float,
+        size: Optional[int],
+    ) -> None:
+        values = (elapsed, stats.db, stats.queries, stats.templates, size)
+        with self._lock:
+            series = self._series.get((view, method))
+            if series is None:
+                series = self._series[(view, method)] = [Histogram(bounds) for _, _, bounds in HISTOGRAMS]
+            for histogram, value in zip(series, values):
+                if value is not None:
+                    histogram.observe(value)
+            key = (view, method, str(status))
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            series = {
+                labels: [(list(h.cumulative()), h.total, h.count) for h in histograms]
+                for labels, histograms in self._series.items()
+            }
+            return series, dict(self._responses), self.started
+
+
+registry = Registry()
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def exposition() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+
+    series, responses, started = registry.snapshot()
+    lines = [
+        "# HELP hub_requests_total Requests answered, by view, method and status.",
+        "# TYPE hub_requests_total counter",
+    ]
+    for (view, method, status), count in sorted(responses.items()):
+        lines.append(f'hub_requests_total{{view="{_label(view)}",method="{method}",status="{status}"}} {count}')
+    for index, (name, help_text, _) in enumerate(HISTOGRAMS):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (view, method), histograms in sorted(series.items()):
+            buckets, total, count = histograms[index]
+            if not count:
+                continue
+            labels = f'view="{_label(view)}",method="{method}"'
+            for bound, running in buckets:
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {running}')
+            lines.append(f"{name}_sum{{{labels}}} {total!r}")
+            lines.append(f"{name}_count{{{labels}}} {count}")
+    lines.append("# HELP hub_metrics_start_time_seconds When this process started collecting.")
+    lines.append("# TYPE hub_metrics_start_time_seconds gauge")
+    lines.append(f'hub_metrics_start_time_seconds{{pid="{os.getpid()}"}} {started!r}')
+    return "\n".join(lines) + "\n"
+
+
+def server_timing(stats: RequestStats, elapsed: float) -> str:
+    return (
+        f'app;dur={elapsed * 1000:.1f}, '
+        f'db;dur={stats.db * 1000:.1f};desc="{stats.queries} queries", '
+        f'tpl;dur={stats.templates * 1000:.1f}'
+    )
+
+
+def record(request, response, stats: RequestStats) -> None:
+    elapsed = stats.elapsed()
+    match = getattr(request, "resolver_match", None)
+    view = (match.view_name if match else None) or UNMATCHED
+    size = None if response.streaming else len(response.content)
+    method = request.method if request.method in METHODS else "OTHER"
+    registry.observe(view, method, response.status_code, stats, elapsed, size)
+    if _shows_server_timing(request):
+        response["Server-Timing"] = server_timing(stats, elapsed)
+
+
+def _shows_server_timing(request) -> bool:
+    # Timings and query counts describe the server's internals, so they are
+    # opt-in and, even then, only sent to administrators.
+    if not getattr(settings, "METRICS_SERVER_TIMING", False):
+        return False
+    user = getattr(request, "user", None)
+    return user is not None and user.is_authenticated and (user.is_staff or user.role == "admin")
@@ -1,6 +1,13 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 from django.shortcuts import redirect
 from django.contrib import messages
 
+from . import metrics, profiling
+
 class AdminAccessMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -15,3 +22,92 @@ class AdminAccessMiddleware:
             
         response = self.get_response(request)
         return response
+
+
+class RequestMetricsMiddleware:
+    """Records per-view timings and query counts; see hub.metrics."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = metrics.enabled()
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        stats, token = metrics.start()
+        try:
+            response = self.get_response(request)
+            metrics.record(request, response, stats)
+            return response
+        finally:
+            metrics.finish(token)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        stats, token = metrics.start()
+        try:
+            response = await self.get_response(request)
+            metrics.record(request, response, stats)
+            return response
+        finally:
+            metrics.finish(token)
+
+
+class QueryProfilerMiddleware:
+    """Writes a per-request SQL report when QUERY_PROFILER_ENABLED; see hub.profiling."""
+
+    sync_capable = True
+    async_capable = True
+    skip_prefixes = ('/admin/query-profiles/', '/metrics/')
+
+    def __init__(self, get_response):
+        if not profiling.enabled():
+            raise MiddlewareNotUsed
+        profiling.install()
+        self.get_response = get_response
+        self.skip = self.skip_prefixes + ((settings.STATIC_URL,) if settings.STATIC_URL.startswith('/') else ())
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _finish(self, request, response, token, started):
+        queries = profiling.finish(token)
+        profile = profiling.report(request, response, queries, time.perf_counter() - started)
+        profiling.save(profile)
+        response['X-Query-Profile'] = profile['id']
+        return response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if request.path.startswith(self.skip):
+            return self.get_response(request)
+        started = time.perf_counter()
+        token = profiling.start()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            profiling.finish(token)
+            raise
+        return self._finish(request, response, token, started)
+
+    async def __acall__(self, request):
+        if request.path.startswith(self.skip):
+            return await self.get_response(request)
+        started = time.perf_counter()
+        token = profiling.start()
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            profiling.finish(token)
+            raise
+        return self._finish(request, response, token, started)
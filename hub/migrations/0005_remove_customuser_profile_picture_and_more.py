@@ -22,32 +22,42 @@ class Migration(migrations.Migration):
             name='role',
             field=models.CharField(choices=[('admin', 'Administrator'), ('user', 'User')], default='user', max_length=20),
         ),
-        migrations.CreateModel(
-            name='Project',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('idea', models.CharField(help_text='A short identifier so you can map predictions back to investigations.', max_length=255)),
-                ('file_type', models.CharField(choices=[('image', 'Image'), ('video', 'Video'), ('link', 'Link')], max_length=10)),
-                ('file', models.FileField(blank=True, help_text='Required for image/video uploads.', null=True, upload_to='uploads/')),
-                ('link_url', models.URLField(blank=True, help_text='Required for link submissions.')),
-                ('description', models.TextField(blank=True)),
-                ('file_name', models.CharField(blank=True, max_length=255)),
-                ('file_size', models.PositiveIntegerField(default=0)),
-                ('public_id', models.CharField(blank=True, editable=False, max_length=20, null=True, unique=True)),
-                ('prediction_confidence', models.DecimalField(decimal_places=2, default=0, max_digits=5, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
-                ('verdict', models.CharField(default='Pending', max_length=50)),
-                ('created_at', models.DateTimeField(auto_now_add=True)),
-                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='projects', to=settings.AUTH_USER_MODEL)),
+        # Upload was renamed to Project on the same hub_upload table (0003
+        # already pinned db_table), so only the migration state changes; a
+        # real CreateModel would fail with "table hub_upload already exists".
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Project',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('idea', models.CharField(help_text='A short identifier so you can map predictions back to investigations.', max_length=255)),
+                        ('file_type', models.CharField(choices=[('image', 'Image'), ('video', 'Video'), ('link', 'Link')], max_length=10)),
+                        ('file', models.FileField(blank=True, help_text='Required for image/video uploads.', null=True, upload_to='uploads/')),
+                        ('link_url', models.URLField(blank=True, help_text='Required for link submissions.')),
+                        ('description', models.TextField(blank=True)),
+                        ('file_name', models.CharField(blank=True, max_length=255)),
+                        ('file_size', models.PositiveIntegerField(default=0)),
+                        ('public_id', models.CharField(blank=True, editable=False, max_length=20, null=True, unique=True)),
+                        ('prediction_confidence', models.DecimalField(decimal_places=2, default=0, max_digits=5, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                        ('verdict', models.CharField(default='Pending', max_length=50)),
+                        ('created_at', models.DateTimeField(auto_now_add=True)),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='projects', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'hub_upload',
+                        'ordering': ['-created_at'],
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='statistic',
+                    name='project',
+                    field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='hub.project'),
+                ),
+                migrations.DeleteModel(
+                    name='Upload',
+                ),
             ],
-            options={
-                'db_table': 'hub_upload',
-                'ordering': ['-created_at'],
-            },
-        ),
-        migrations.AlterField(
-            model_name='statistic',
-            name='project',
-            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='hub.project'),
         ),
         migrations.CreateModel(
             name='UserLoginLog',
@@ -62,7 +72,4 @@ class Migration(migrations.Migration):
                 'ordering': ['-login_time'],
             },
         ),
-        migrations.DeleteModel(
-            name='Upload',
-        ),
     ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:16
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rollups(apps, schema_editor):
+    Project = apps.get_model("hub", "Project")
+    ProjectRollup = apps.get_model("hub", "ProjectRollup")
+    IdeaRollup = apps.get_model("hub", "IdeaRollup")
+    totals = {"uploads": Count("id"), "confidence_total": Sum("prediction_confidence")}
+
+    rollups = [
+        ProjectRollup(
+            scope=f"user:{row['user_id']}",
+            uploads=row["uploads"],
+            confidence_total=row["confidence_total"] or 0,
+        )
+        for row in Project.objects.order_by().values("user_id").annotate(**totals)
+    ]
+    overall = Project.objects.aggregate(**totals)
+    rollups.append(
+        ProjectRollup(
+            scope="global",
+            uploads=overall["uploads"],
+            confidence_total=overall["confidence_total"] or 0,
+        )
+    )
+    ProjectRollup.objects.bulk_create(rollups)
+    IdeaRollup.objects.bulk_create(
+        (
+            IdeaRollup(
+                idea=row["idea"],
+                uploads=row["uploads"],
+                confidence_total=row["confidence_total"] or 0,
+            )
+            for row in Project.objects.order_by().values("idea").annotate(**totals)
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hub', '0005_remove_customuser_profile_picture_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdeaRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idea', models.CharField(max_length=255, unique=True)),
+                ('uploads', models.IntegerField(default=0)),
+                ('confidence_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProjectRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=40, unique=True)),
+                ('uploads', models.IntegerField(default=0)),
+                ('confidence_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hub', '0006_projectrollup_idearollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('predict', 'Prediction')], default='predict', max_length=20)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('claimed_by', models.CharField(blank=True, max_length=100)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='hub.project')),
+            ],
+            options={
+                'ordering': ['available_at', 'id'],
+                'indexes': [models.Index(fields=['kind', 'status', 'available_at'], name='hub_job_claim_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='projectjob',
+            constraint=models.UniqueConstraint(fields=('project', 'kind'), name='unique_project_job_kind'),
+        ),
+    ]
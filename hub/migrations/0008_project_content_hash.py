@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hub', '0007_projectjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='SHA-256 of the file bytes or of the normalized link URL.', max_length=64),
+        ),
+    ]
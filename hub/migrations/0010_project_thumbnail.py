@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hub', '0009_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='thumbnail',
+            field=models.FileField(blank=True, editable=False, help_text='Downscaled preview (or video poster frame) generated after upload.', null=True, upload_to='uploads/'),
+        ),
+        migrations.AlterField(
+            model_name='projectjob',
+            name='kind',
+            field=models.CharField(choices=[('predict', 'Prediction'), ('thumbnail', 'Thumbnail')], default='predict', max_length=20),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def build_index(apps, schema_editor):
+    from hub import search
+
+    search.backend(schema_editor.connection.alias).rebuild()
+
+
+def drop_index(apps, schema_editor):
+    from hub import search
+
+    search.backend(schema_editor.connection.alias).uninstall()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hub", "0010_project_thumbnail"),
+    ]
+
+    operations = [
+        migrations.RunPython(build_index, drop_index),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hub', '0011_upload_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['user', 'created_at'], name='hub_upload_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['created_at'], name='hub_upload_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['idea'], name='hub_upload_idea_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['prediction_confidence'], name='hub_upload_confidence_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['verdict'], name='hub_upload_verdict_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='statistic',
+            index=models.Index(fields=['recorded_at'], name='hub_statistic_recorded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='statistic',
+            index=models.Index(fields=['metric_name'], name='hub_statistic_metric_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userloginlog',
+            index=models.Index(fields=['user', 'login_time'], name='hub_login_user_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userloginlog',
+            index=models.Index(fields=['login_time'], name='hub_login_time_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:32
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_months(apps, schema_editor):
+    Project = apps.get_model("hub", "Project")
+    MonthlyRollup = apps.get_model("hub", "MonthlyRollup")
+    MonthlyRollup.objects.bulk_create(
+        (
+            MonthlyRollup(
+                month=row["month"].date(),
+                uploads=row["uploads"],
+                confidence_total=row["confidence_total"] or 0,
+            )
+            for row in Project.objects.order_by()
+            .annotate(month=TruncMonth("created_at"))
+            .values("month")
+            .annotate(uploads=Count("id"), confidence_total=Sum("prediction_confidence"))
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hub', '0012_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month.', unique=True)),
+                ('uploads', models.IntegerField(default=0)),
+                ('confidence_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.RunPython(backfill_months, migrations.RunPython.noop),
+    ]
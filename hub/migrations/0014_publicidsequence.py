@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:38
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def seed_sequence(apps, schema_editor):
+    Project = apps.get_model("hub", "Project")
+    PublicIdSequence = apps.get_model("hub", "PublicIdSequence")
+    highest = Project.objects.aggregate(value=Max("pk"))["value"] or 0
+    public_ids = Project.objects.filter(public_id__startswith="ID").values_list("public_id", flat=True)
+    for public_id in public_ids.iterator():
+        if public_id[2:].isdigit():
+            highest = max(highest, int(public_id[2:]))
+    PublicIdSequence.objects.create(name="project", next_value=highest + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hub', '0013_monthlyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicIdSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=40, unique=True)),
+                ('next_value', models.BigIntegerField(default=1)),
+            ],
+        ),
+        migrations.RunPython(seed_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:55
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDay, TruncHour, TruncMinute
+import django.utils.timezone
+
+
+def backfill_statistic_rollups(apps, schema_editor):
+    Statistic = apps.get_model("hub", "Statistic")
+    StatisticRollup = apps.get_model("hub", "StatisticRollup")
+    totals = {
+        "points": Count("id"),
+        "total": Sum("metric_value"),
+        "minimum": Min("metric_value"),
+        "maximum": Max("metric_value"),
+    }
+    for resolution, trunc in (("minute", TruncMinute), ("hour", TruncHour), ("day", TruncDay)):
+        grouped = Statistic.objects.order_by().annotate(bucket=trunc("recorded_at"))
+        rows = [
+            (f"project:{row['project_id']}", row)
+            for row in grouped.values("project_id", "metric_name", "bucket").annotate(**totals)
+        ] + [("global", row) for row in grouped.values("metric_name", "bucket").annotate(**totals)]
+        StatisticRollup.objects.bulk_create(
+            (
+                StatisticRollup(
+                    resolution=resolution,
+                    scope=scope,
+                    metric_name=row["metric_name"],
+                    bucket=row["bucket"],
+                    points=row["points"],
+                    total=row["total"],
+                    minimum=row["minimum"],
+                    maximum=row["maximum"],
+                )
+                for scope, row in rows
+            ),
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hub', '0014_publicidsequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatisticRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour'), ('day', 'Day')], max_length=10)),
+                ('scope', models.CharField(max_length=40)),
+                ('metric_name', models.CharField(max_length=100)),
+                ('bucket', models.DateTimeField(help_text='Start of the bucket.')),
+                ('points', models.IntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('minimum', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('maximum', models.DecimalField(decimal_places=2, max_digits=10)),
+            ],
+            options={
+                'ordering': ['bucket'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='statistic',
+            name='hub_statistic_metric_idx',
+        ),
+        migrations.AlterField(
+            model_name='statistic',
+            name='recorded_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='statistic',
+            index=models.Index(fields=['metric_name', 'recorded_at'], name='hub_statistic_metric_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='statisticrollup',
+            index=models.Index(fields=['resolution', 'bucket'], name='hub_statrollup_age_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='statisticrollup',
+            constraint=models.UniqueConstraint(fields=('resolution', 'scope', 'metric_name', 'bucket'), name='hub_statrollup_bucket_uniq'),
+        ),
+        migrations.RunPython(backfill_statistic_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:21
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+SCORED = ~Q(verdict="Pending")
+
+
+def backfill_scored(apps, schema_editor):
+    # Pending and failed uploads no longer count towards confidence_total.
+    Project = apps.get_model("hub", "Project")
+    ProjectRollup = apps.get_model("hub", "ProjectRollup")
+    IdeaRollup = apps.get_model("hub", "IdeaRollup")
+    MonthlyRollup = apps.get_model("hub", "MonthlyRollup")
+    totals = {"scored": Count("id", filter=SCORED), "confidence_total": Sum("prediction_confidence", filter=SCORED)}
+    uploads = Project.objects.order_by()
+
+    def store(model, lookup, row):
+        model.objects.filter(**lookup).update(scored=row["scored"], confidence_total=row["confidence_total"] or 0)
+
+    for row in uploads.values("user_id").annotate(**totals):
+        store(ProjectRollup, {"scope": f"user:{row['user_id']}"}, row)
+    store(ProjectRollup, {"scope": "global"}, uploads.aggregate(**totals))
+    for row in uploads.values("idea").annotate(**totals):
+        store(IdeaRollup, {"idea": row["idea"]}, row)
+    for row in uploads.annotate(month=TruncMonth("created_at")).values("month").annotate(**totals):
+        store(MonthlyRollup, {"month": row["month"].date()}, row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hub', '0016_login_time_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idearollup',
+            name='scored',
+            field=models.IntegerField(default=0, help_text='Uploads with a prediction; only these count in confidence_total.'),
+        ),
+        migrations.AddField(
+            model_name='monthlyrollup',
+            name='scored',
+            field=models.IntegerField(default=0, help_text='Uploads with a prediction; only these count in confidence_total.'),
+        ),
+        migrations.AddField(
+            model_name='projectrollup',
+            name='scored',
+            field=models.IntegerField(default=0, help_text='Uploads with a prediction; only these count in confidence_total.'),
+        ),
+        migrations.RunPython(backfill_scored, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,25 @@
+import uuid
+from datetime import datetime
 from pathlib import Path
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import models, router
+from django.utils import timezone
+
+
+def month_bounds(year: int, month: int):
+    """Aware [start, end) datetimes of a calendar month, or None when it is invalid."""
+
+    try:
+        start = timezone.make_aware(datetime(year, month, 1))
+        end = timezone.make_aware(
+            datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+        )
+    except (OverflowError, ValueError):
+        return None
+    return start, end
 
 
 class CustomUser(AbstractUser):
@@ -25,6 +41,50 @@ class CustomUser(AbstractUser):
         return self.is_staff or self.role == "admin"
 
 
+class ProjectQuerySet(models.QuerySet):
+    LISTING_FIELDS = (
+        "id",
+        "user__username",
+        "idea",
+        "file_type",
+        "file",
+        "thumbnail",
+        "link_url",
+        "file_name",
+        "file_size",
+        "public_id",
+        "prediction_confidence",
+        "verdict",
+        "created_at",
+    )
+
+    def visible_to(self, user):
+        """Everything for administrators, otherwise only the user's own uploads."""
+
+        if user.is_staff or user.role == "admin":
+            return self
+        return self.filter(user=user)
+
+    def created_in_month(self, year: int, month: int):
+        """
+        Uploads from one calendar month as a half-open range on `created_at`,
+        which the created_at indexes can serve, unlike `__year`/`__month`.
+        """
+
+        bounds = month_bounds(year, month)
+        if bounds is None:
+            return self.none()
+        return self.filter(created_at__gte=bounds[0], created_at__lt=bounds[1])
+
+    def with_related(self):
+        return self.select_related("user")
+
+    def for_listing(self):
+        """Columns the history, report and profile listings render, in one query."""
+
+        return self.with_related().only(*self.LISTING_FIELDS)
+
+
 class Project(models.Model):
     FILE_TYPES = [
         ("image", "Image"),
@@ -50,6 +110,20 @@ class Project(models.Model):
     description = models.TextField(blank=True)
     file_name = models.CharField(max_length=255, blank=True)
     file_size = models.PositiveIntegerField(default=0)
+    thumbnail = models.FileField(
+        upload_to="uploads/",
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="Downscaled preview (or video poster frame) generated after upload.",
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="SHA-256 of the file bytes or of the normalized link URL.",
+    )
     public_id = models.CharField(
         max_length=20,
         unique=True,
@@ -66,13 +140,31 @@ class Project(models.Model):
     verdict = models.CharField(max_length=50, default="Pending")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ProjectQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
         db_table = "hub_upload"
+        indexes = [
+            models.Index(fields=["user", "created_at"], name="hub_upload_user_created_idx"),
+            models.Index(fields=["created_at"], name="hub_upload_created_idx"),
+            models.Index(fields=["idea"], name="hub_upload_idea_idx"),
+            models.Index(fields=["prediction_confidence"], name="hub_upload_confidence_idx"),
+            models.Index(fields=["verdict"], name="hub_upload_verdict_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.idea} ({self.file_type})"
 
+    @property
+    def thumbnail_url(self):
+        """
+        Preview for listings, or None while it is pending (or for links) so
+        templates show a placeholder instead of the full-size original.
+        """
+
+        return self.thumbnail.url if self.thumbnail else None
+
     def save(self, *args, **kwargs):
         if not self.idea:
             if self.link_url:
@@ -91,12 +183,30 @@ class Project(models.Model):
         elif self.link_url:
             self.file_name = self.link_url
             self.file_size = 0
-        is_new = self.pk is None
+        if not self.public_id:
+            # Assigned before the INSERT so an upload never exists without one.
+            from .public_ids import next_public_id
+
+            using = kwargs.get("using") or router.db_for_write(Project, instance=self)
+            self.public_id = next_public_id(using)
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "public_id"}
         super().save(*args, **kwargs)
-        if (is_new or not self.public_id) and self.pk:
-            public_id = f"ID{self.pk}"
-            Project.objects.filter(pk=self.pk).update(public_id=public_id)
-            self.public_id = public_id
+
+
+class StatisticQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.select_related("project")
+
+    def for_listing(self):
+        return self.with_related().only(
+            "id",
+            "metric_name",
+            "metric_value",
+            "recorded_at",
+            "project__idea",
+            "project__file_type",
+        )
 
 
 class Statistic(models.Model):
@@ -105,26 +215,269 @@ class Statistic(models.Model):
     )
     metric_name = models.CharField(max_length=100)
     metric_value = models.DecimalField(max_digits=10, decimal_places=2)
-    recorded_at = models.DateTimeField(auto_now_add=True)
+    # A default rather than auto_now_add so bulk ingestion (hub.timeseries)
+    # can keep each point's own timestamp.
+    recorded_at = models.DateTimeField(default=timezone.now, editable=False)
     notes = models.TextField(blank=True)
 
+    objects = StatisticQuerySet.as_manager()
+
     class Meta:
         ordering = ["-recorded_at"]
+        indexes = [
+            models.Index(fields=["recorded_at"], name="hub_statistic_recorded_idx"),
+            models.Index(
+                fields=["metric_name", "recorded_at"], name="hub_statistic_metric_time_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.metric_name}: {self.metric_value} ({self.project.idea})"
 
 
+class UserLoginLogQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.select_related("user")
+
+    def for_listing(self):
+        return self.with_related().only(
+            "id",
+            "login_time",
+            "ip_address",
+            "user__username",
+        )
+
+
 class UserLoginLog(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="login_logs"
     )
-    login_time = models.DateTimeField(auto_now_add=True)
+    # Set when the login happens, not when hub.audit gets to write the row.
+    login_time = models.DateTimeField(default=timezone.now, editable=False)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
 
+    objects = UserLoginLogQuerySet.as_manager()
+
     class Meta:
         ordering = ["-login_time"]
+        indexes = [
+            models.Index(fields=["user", "login_time"], name="hub_login_user_time_idx"),
+            models.Index(fields=["login_time"], name="hub_login_time_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user.username} - {self.login_time}"
+
+
+class ProjectRollup(models.Model):
+    """
+    Running upload totals for one dashboard scope. Each contributor has a
+    `user:<id>` row and administrators read the single `global` row, so the
+    summary cards never have to aggregate `hub_upload` on page load.
+    """
+
+    GLOBAL_SCOPE = "global"
+
+    scope = models.CharField(max_length=40, unique=True)
+    uploads = models.IntegerField(default=0)
+    scored = models.IntegerField(default=0, help_text="Uploads with a prediction; only these count in confidence_total.")
+    confidence_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.scope}: {self.uploads} uploads"
+
+    @classmethod
+    def scope_for(cls, user=None) -> str:
+        return cls.GLOBAL_SCOPE if user is None else f"user:{getattr(user, 'pk', user)}"
+
+    @property
+    def avg_confidence(self):
+        # Pending and failed uploads still hold the default 0 confidence.
+        if not self.scored:
+            return None
+        return round(self.confidence_total / self.scored, 2)
+
+
+class IdeaRollup(models.Model):
+    """Per-idea totals behind the administrator idea statistics."""
+
+    idea = models.CharField(max_length=255, unique=True)
+    uploads = models.IntegerField(default=0)
+    scored = models.IntegerField(default=0, help_text="Uploads with a prediction; only these count in confidence_total.")
+    confidence_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self) -> str:
+        return f"{self.idea}: {self.uploads} uploads"
+
+
+class MonthlyRollup(models.Model):
+    """Upload totals per calendar month behind the reports month picker."""
+
+    month = models.DateField(unique=True, help_text="First day of the month.")
+    uploads = models.IntegerField(default=0)
+    scored = models.IntegerField(default=0, help_text="Uploads with a prediction; only these count in confidence_total.")
+    confidence_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ["-month"]
+
+    def __str__(self) -> str:
+        return f"{self.month:%Y-%m}: {self.uploads} uploads"
+
+    @property
+    def avg_confidence(self):
+        # Pending and failed uploads still hold the default 0 confidence.
+        if not self.scored:
+            return None
+        return round(self.confidence_total / self.scored, 2)
+
+
+class StatisticRollup(models.Model):
+    """
+    Totals of one metric per minute, hour or day bucket, for a single upload
+    (`project:<id>`) or across all uploads (`global`). `hub.timeseries`
+    updates them as points are recorded, so trend queries read one row per
+    bucket and raw `Statistic` rows can be downsampled once they age out.
+    """
+
+    RESOLUTIONS = [
+        ("minute", "Minute"),
+        ("hour", "Hour"),
+        ("day", "Day"),
+    ]
+    GLOBAL_SCOPE = "global"
+
+    resolution = models.CharField(max_length=10, choices=RESOLUTIONS)
+    scope = models.CharField(max_length=40)
+    metric_name = models.CharField(max_length=100)
+    bucket = models.DateTimeField(help_text="Start of the bucket.")
+    points = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    minimum = models.DecimalField(max_digits=10, decimal_places=2)
+    maximum = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        ordering = ["bucket"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["resolution", "scope", "metric_name", "bucket"],
+                name="hub_statrollup_bucket_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["resolution", "bucket"], name="hub_statrollup_age_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.metric_name} {self.scope} {self.resolution} {self.bucket:%Y-%m-%d %H:%M}"
+
+    @classmethod
+    def scope_for(cls, project=None) -> str:
+        return cls.GLOBAL_SCOPE if project is None else f"project:{getattr(project, 'pk', project)}"
+
+    @property
+    def average(self):
+        if not self.points:
+            return None
+        return round(self.total / self.points, 2)
+
+
+class PublicIdSequence(models.Model):
+    """
+    Next free `Project.public_id` number. Processes reserve whole blocks of
+    numbers from it at a time (see `hub.public_ids`).
+    """
+
+    name = models.CharField(max_length=40, unique=True)
+    next_value = models.BigIntegerField(default=1)
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.next_value}"
+
+
+class ProjectJob(models.Model):
+    """
+    Background work queued against an upload. Workers claim rows by moving them
+    to `running` with a `locked_until` deadline; a job whose worker dies becomes
+    claimable again once that visibility timeout passes (see `hub.jobs`).
+    """
+
+    KIND_CHOICES = [
+        ("predict", "Prediction"),
+        ("thumbnail", "Thumbnail"),
+    ]
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="jobs")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default="predict")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    claimed_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["available_at", "id"]
+        constraints = [
+            models.UniqueConstraint(fields=["project", "kind"], name="unique_project_job_kind"),
+        ]
+        indexes = [
+            models.Index(fields=["kind", "status", "available_at"], name="hub_job_claim_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} for project {self.project_id} ({self.status})"
+
+
+class UploadSession(models.Model):
+    """
+    A resumable upload in progress. Chunks live on disk next to the media
+    uploads (see `hub.resumable`); the row only records the declared file and
+    the `Project` it became once finalized.
+    """
+
+    STATUS_CHOICES = [
+        ("open", "Open"),
+        ("finalizing", "Finalizing"),
+        ("complete", "Complete"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="upload_sessions"
+    )
+    file_type = models.CharField(max_length=10, choices=Project.FILE_TYPES)
+    file_name = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="open")
+    project = models.ForeignKey(
+        Project, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"{self.file_name} ({self.status})"
+
+    @property
+    def total_chunks(self) -> int:
+        return max(1, -(-self.total_size // self.chunk_size))
+
+    def expected_chunk_size(self, index: int) -> int:
+        if index < self.total_chunks - 1:
+            return self.chunk_size
+        return self.total_size - self.chunk_size * (self.total_chunks - 1)
@@ -0,0 +1,100 @@
+"""
+Keyset ("seek") pagination for the history listings.
+
+Pages are ordered newest first on `(<timestamp>, id)`, or highest first on
+`(<decimal>, id)` for the confidence map, and the cursor encodes the last
+row of the previous page, so fetching page N costs the same index range
+scan as page 1 instead of an ever-growing OFFSET.
+"""
+
+import base64
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, List, Optional, Tuple, Union
+
+from django.db.models import DecimalField, Q, QuerySet
+
+PAGE_SIZE = 25
+
+
+@dataclass
+class KeysetPage:
+    items: List = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+Key = Union[datetime, Decimal]
+
+
+def encode_cursor(key: Key, pk: int) -> str:
+    value = key.isoformat() if isinstance(key, datetime) else str(key)
+    raw = f"{value}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, parse: Callable[[str], Key] = datetime.fromisoformat) -> Tuple[Key, int]:
+    """Decode a cursor produced by `encode_cursor`; raises ValueError if malformed."""
+
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        key, pk = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        value = parse(key)
+        if isinstance(value, Decimal) and not value.is_finite():
+            raise ValueError(key)
+        return value, int(pk)
+    # decimal.InvalidOperation is an ArithmeticError.
+    except (ArithmeticError, TypeError, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f"Invalid cursor: {token!r}") from exc
+
+
+def keyset_page(
+    queryset: QuerySet,
+    cursor: Optional[str] = None,
+    size: int = PAGE_SIZE,
+    order_field: str = "created_at",
+) -> KeysetPage:
+    """Return the page of `queryset` that follows `cursor`, newest (or highest) first."""
+
+    rows = list(_seek(queryset, cursor, size, order_field))
+    return _page(rows, size, order_field)
+
+
+async def akeyset_page(
+    queryset: QuerySet,
+    cursor: Optional[str] = None,
+    size: int = PAGE_SIZE,
+    order_field: str = "created_at",
+) -> KeysetPage:
+    rows = [row async for row in _seek(queryset, cursor, size, order_field)]
+    return _page(rows, size, order_field)
+
+
+def _seek(queryset: QuerySet, cursor: Optional[str], size: int, order_field: str) -> QuerySet:
+    queryset = queryset.order_by(f"-{order_field}", "-id")
+    if cursor:
+        decimal = isinstance(queryset.model._meta.get_field(order_field), DecimalField)
+        key, pk = decode_cursor(cursor, Decimal if decimal else datetime.fromisoformat)
+        queryset = queryset.filter(
+            Q(**{f"{order_field}__lt": key})
+            | Q(**{order_field: key, "id__lt": pk})
+        )
+    return queryset[: size + 1]
+
+
+def _page(rows: List, size: int, order_field: str) -> KeysetPage:
+    page = KeysetPage(items=rows[:size])
+    if len(rows) > size:
+        last = page.items[-1]
+        page.next_cursor = encode_cursor(getattr(last, order_field), last.pk)
+    return page
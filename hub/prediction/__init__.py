@@ -0,0 +1,57 @@
+"""
+Pluggable prediction engines.
+
+`PREDICTION_BACKEND` selects the engine by registry name ("heuristic",
+"numpy") or by dotted path to a `PredictionBackend` subclass. Backends are
+instantiated and loaded once per process and then reused for every batch.
+"""
+
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from .base import Payload, PredictionBackend
+
+BACKENDS = {
+    "heuristic": "hub.prediction.heuristic.HeuristicBackend",
+    "numpy": "hub.prediction.vectorized.NumpyHeuristicBackend",
+}
+
+_loaded: Dict[str, PredictionBackend] = {}
+
+
+def get_backend(name: Optional[str] = None) -> PredictionBackend:
+    name = name or getattr(settings, "PREDICTION_BACKEND", "heuristic")
+    backend = _loaded.get(name)
+    if backend is None:
+        try:
+            backend_class = import_string(BACKENDS.get(name, name))
+        except ImportError as exc:
+            raise ImproperlyConfigured(
+                f"Unknown PREDICTION_BACKEND {name!r}: use one of {', '.join(BACKENDS)} "
+                "or the dotted path to a PredictionBackend subclass."
+            ) from exc
+        backend = backend_class()
+        backend.load()
+        _loaded[name] = backend
+    return backend
+
+
+def predict_batch(payloads: List[Payload], backend: Optional[str] = None) -> List[float]:
+    return get_backend(backend).predict_batch(payloads)
+
+
+def verdict_for(confidence: float) -> str:
+    return "Likely True" if confidence >= 60 else "Needs Review"
+
+
+__all__ = [
+    "BACKENDS",
+    "Payload",
+    "PredictionBackend",
+    "get_backend",
+    "predict_batch",
+    "verdict_for",
+]
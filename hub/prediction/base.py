@@ -0,0 +1,22 @@
+from typing import Dict, List
+
+Payload = Dict[str, str]
+
+
+class PredictionBackend:
+    """
+    Contract for prediction engines. `load()` runs once per process before the
+    first batch, so backends can warm models there instead of at import time;
+    `predict_batch()` must return one confidence (0-100) per payload, in order.
+    """
+
+    name = ""
+
+    def load(self) -> None:
+        pass
+
+    def predict_batch(self, payloads: List[Payload]) -> List[float]:
+        raise NotImplementedError
+
+    def predict(self, payload: Payload) -> float:
+        return self.predict_batch([payload])[0]
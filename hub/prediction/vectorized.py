@@ -0,0 +1,45 @@
+from typing import List
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import Payload, PredictionBackend
+
+
+class NumpyHeuristicBackend(PredictionBackend):
+    """
+    The heuristic backend evaluated with NumPy: every payload in the batch is
+    decoded into one code-point array and summed per segment with
+    `np.add.reduceat`, giving the same scores without a Python loop per
+    character.
+    """
+
+    name = "numpy"
+
+    def load(self) -> None:
+        try:
+            import numpy
+        except ImportError as exc:
+            raise ImproperlyConfigured(
+                "The 'numpy' prediction backend requires NumPy (pip install numpy)."
+            ) from exc
+        self.np = numpy
+
+    def predict_batch(self, payloads: List[Payload]) -> List[float]:
+        np = self.np
+        if not payloads:
+            return []
+        texts = ["".join(payload.values()) for payload in payloads]
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+        # surrogatepass keeps lone surrogates (which ord() scores like any
+        # other code point) from failing the whole batch.
+        codepoints = np.frombuffer(
+            "".join(texts).encode("utf-32-le", "surrogatepass"), dtype=np.uint32
+        )
+        sums = np.zeros(len(texts), dtype=np.int64)
+        filled = lengths > 0
+        if codepoints.size:
+            starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            sums[filled] = np.add.reduceat(codepoints.astype(np.int64), starts[filled])
+        scores = np.minimum(35 + sums % 66, 99.9)
+        scores = np.where(filled, scores, 50.0)
+        return np.round(scores, 2).tolist()
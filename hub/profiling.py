@@ -0,0 +1,258 @@
+"""
+Opt-in SQL profiler for development and staging.
+
+With `QUERY_PROFILER_ENABLED=True`, `hub.middleware.QueryProfilerMiddleware`
+records every statement a request runs, with its duration and where it came
+from. The origin is a short stack of the project's own frames, plus the
+template name and line when a template triggered the query by evaluating a
+lazy queryset. When the response is ready, the request is analysed for:
+
+- duplicates: the same SQL with the same parameters, run more than once;
+- repeats: the same SQL with different parameters, run at least
+  `QUERY_PROFILER_REPEAT` times. This is the N+1 shape of a loop fetching
+  one row per item;
+- slow statements: those taking at least `QUERY_PROFILER_SLOW_MS`.
+
+Each request's report is written as JSON to `QUERY_PROFILER_DIR`, keeping
+the newest `QUERY_PROFILER_KEEP`, and its id is returned in the
+`X-Query-Profile` header. Staff can browse the reports at
+`/admin/query-profiles/`. Parameters are hashed rather than stored, so
+reports never contain session keys or form input.
+
+Walking the stack on every query is far too slow for production; the
+middleware removes itself unless the setting is on.
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+DEFAULT_SLOW_MS = 100
+DEFAULT_REPEAT = 3
+DEFAULT_KEEP = 200
+STACK_DEPTH = 6
+SUMMARY_FIELDS = ("id", "created_at", "method", "path", "view", "status", "duration_ms", "query_count", "db_ms")
+PROFILE_ID = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+
+_current: contextvars.ContextVar = contextvars.ContextVar("hub_query_profile", default=None)
+# Instrumentation frames that would otherwise be every query's origin.
+_SKIP_FILES = {
+    os.path.join(os.path.dirname(__file__), name) for name in ("profiling.py", "middleware.py", "metrics.py")
+}
+
+
+def enabled() -> bool:
+    return getattr(settings, "QUERY_PROFILER_ENABLED", False)
+
+
+def slow_ms() -> float:
+    return getattr(settings, "QUERY_PROFILER_SLOW_MS", DEFAULT_SLOW_MS)
+
+
+def repeat_threshold() -> int:
+    return getattr(settings, "QUERY_PROFILER_REPEAT", DEFAULT_REPEAT)
+
+
+def directory() -> Path:
+    return Path(getattr(settings, "QUERY_PROFILER_DIR", Path(settings.BASE_DIR) / "logs" / "query_profiles"))
+
+
+def _project_root() -> str:
+    return str(settings.BASE_DIR) + os.sep
+
+
+def _origin(frame) -> Dict[str, object]:
+    """Project frames (innermost first) and the template line that ran the query."""
+
+    root = _project_root()
+    stack: List[str] = []
+    template = None
+    library = None
+    while frame is not None:
+        code = frame.f_code
+        filename = code.co_filename
+        if template is None and code.co_name == "render_annotated" and "django" in filename:
+            node = frame.f_locals.get("self")
+            origin = getattr(node, "origin", None)
+            token = getattr(node, "token", None)
+            if origin is not None and token is not None:
+                template = f"{origin.template_name or origin.name}:{token.lineno}"
+        if (
+            len(stack) < STACK_DEPTH
+            and filename.startswith(root)
+            and filename not in _SKIP_FILES
+            and filename != root + "manage.py"
+            and "site-packages" not in filename
+        ):
+            stack.append(f"{os.path.relpath(filename, root)}:{frame.f_lineno} in {code.co_name}")
+        elif library is None and "site-packages" in filename and os.sep + "db" + os.sep not in filename:
+            # Innermost caller outside the ORM, for queries Django itself
+            # issues (sessions, authentication) with no project frame.
+            library = f"{filename.split('site-packages' + os.sep)[-1]}:{frame.f_lineno} in {code.co_name}"
+        frame = frame.f_back
+    if not stack and library:
+        stack.append(library)
+    return {"stack": stack, "template": template}
+
+
+def _capture(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = (time.perf_counter() - started) * 1000
+        origin = _origin(sys._getframe(1))
+        profile.append(
+            {
+                "sql": sql,
+                "many": many,
+                "params": hashlib.sha1(repr(params).encode()).hexdigest()[:12],
+                "alias": context["connection"].alias,
+                "duration_ms": round(duration, 3),
+                "stack": origin["stack"],
+                "template": origin["template"],
+            }
+        )
+
+
+def _install(sender=None, connection=None, **kwargs) -> None:
+    if _capture not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_capture)
+
+
+def install() -> None:
+    """Capture queries on every database connection opened from now on."""
+
+    connection_created.connect(_install, dispatch_uid="hub.profiling.install")
+
+
+def start() -> contextvars.Token:
+    # Connections this thread opened before install() missed the signal.
+    for alias in connections:
+        _install(connection=connections[alias])
+    return _current.set([])
+
+
+def finish(token: contextvars.Token) -> List[Dict[str, object]]:
+    queries = _current.get()
+    _current.reset(token)
+    return queries
+
+
+def _callsite(query: Dict[str, object]) -> str:
+    return query["template"] or (query["stack"][0] if query["stack"] else "?")
+
+
+def analyse(queries: List[Dict[str, object]]) -> Dict[str, List[Dict[str, object]]]:
+    by_statement = defaultdict(list)
+    by_shape = defaultdict(list)
+    for index, query in enumerate(queries):
+        by_statement[(query["sql"], query["params"])].append(index)
+        by_shape[query["sql"]].append(index)
+
+    duplicates = [
+        {
+            "sql": sql,
+            "count": len(indexes),
+            "queries": indexes,
+            "callsites": sorted({_callsite(queries[i]) for i in indexes}),
+        }
+        for (sql, _), indexes in by_statement.items()
+        if len(indexes) > 1
+    ]
+    repeats = [
+        {
+            "sql": sql,
+            "count": len(indexes),
+            "distinct_params": len({queries[i]["params"] for i in indexes}),
+            "queries": indexes,
+            "callsites": sorted({_callsite(queries[i]) for i in indexes}),
+        }
+        for sql, indexes in by_shape.items()
+        if len(indexes) >= repeat_threshold() and len({queries[i]["params"] for i in indexes}) > 1
+    ]
+    threshold = slow_ms()
+    slow = [
+        {"query": index, "sql": query["sql"], "duration_ms": query["duration_ms"], "callsite": _callsite(query)}
+        for index, query in enumerate(queries)
+        if query["duration_ms"] >= threshold
+    ]
+    return {
+        "duplicates": sorted(duplicates, key=lambda row: -row["count"]),
+        "repeats": sorted(repeats, key=lambda row: -row["count"]),
+        "slow": sorted(slow, key=lambda row: -row["duration_ms"]),
+    }
+
+
+def report(request, response, queries: List[Dict[str, object]], elapsed: float) -> Dict[str, object]:
+    now = timezone.now()
+    match = getattr(request, "resolver_match", None)
+    return {
+        "id": f"{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}",
+        "created_at": now.isoformat(),
+        "method": request.method,
+        "path": request.get_full_path(),
+        "view": match.view_name if match else None,
+        "status": response.status_code,
+        "duration_ms": round(elapsed * 1000, 3),
+        "query_count": len(queries),
+        "db_ms": round(sum(query["duration_ms"] for query in queries), 3),
+        **analyse(queries),
+        "queries": queries,
+    }
+
+
+def save(profile: Dict[str, object]) -> Path:
+    target = directory()
+    target.mkdir(parents=True, exist_ok=True)
+    path = target / f"{profile['id']}.json"
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(profile, handle, indent=1)
+    keep = getattr(settings, "QUERY_PROFILER_KEEP", DEFAULT_KEEP)
+    # Ids start with a timestamp, so name order is age order.
+    for stale in sorted(target.glob("*.json"))[:-keep]:
+        stale.unlink(missing_ok=True)
+    return path
+
+
+def listing() -> List[Dict[str, object]]:
+    """Summaries of the stored reports, newest first."""
+
+    rows = []
+    for path in sorted(directory().glob("*.json"), reverse=True):
+        try:
+            with open(path, encoding="utf-8") as handle:
+                profile = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        row = {key: profile.get(key) for key in SUMMARY_FIELDS}
+        for flag in ("duplicates", "repeats", "slow"):
+            row[flag] = len(profile.get(flag, []))
+        rows.append(row)
+    return rows
+
+
+def load(profile_id: str) -> Optional[Dict[str, object]]:
+    if not PROFILE_ID.match(profile_id):
+        return None
+    try:
+        with open(directory() / f"{profile_id}.json", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
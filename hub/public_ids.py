@@ -0,0 +1,137 @@
+"""
+Hi-lo allocation of `Project.public_id` numbers.
+
+Each thread reserves a block of `PUBLIC_ID_BLOCK_SIZE` numbers by bumping
+the `PublicIdSequence` row (an UPDATE the database serializes across
+processes) and then hands them out from memory, so an upload's `ID<n>` is
+written by its own INSERT and reserving costs one UPDATE per block instead
+of one per upload. Numbers continue from the highest existing ID, keeping
+the `ID<n>` format of older rows; a process that exits with part of a block
+unused leaves a gap, never a duplicate.
+
+A block reserved inside a transaction is only trusted by that transaction
+until it commits: if it rolls back, the sequence bump rolls back with it and
+another process may reserve the same numbers, so the block is discarded.
+"""
+
+import functools
+import os
+import threading
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+from django.db.models import BigIntegerField, F, Max
+from django.db.models.functions import Cast, Substr
+
+from .models import Project, PublicIdSequence
+
+SEQUENCE = "project"
+PREFIX = "ID"
+DEFAULT_BLOCK_SIZE = 100
+
+
+class Block:
+    __slots__ = ("next", "end", "pid", "hook")
+
+    def __init__(self, start: int, end: int):
+        self.next = start
+        self.end = end
+        self.pid = os.getpid()
+        self.hook = None
+
+
+def _confirm(block: Block) -> None:
+    block.hook = None
+
+
+def _hook_pending(connection, hook) -> bool:
+    # Django drops the on_commit hooks of a transaction or savepoint that
+    # rolls back, so a hook still queued means the reservation still stands.
+    return any(entry[1] is hook for entry in connection.run_on_commit)
+
+
+def block_size() -> int:
+    return max(1, getattr(settings, "PUBLIC_ID_BLOCK_SIZE", DEFAULT_BLOCK_SIZE))
+
+
+def high_water(using: str = DEFAULT_DB_ALIAS) -> int:
+    """Largest number already used by a primary key or an `ID<n>` public ID."""
+
+    uploads = Project.objects.using(using)
+    largest_pk = uploads.aggregate(value=Max("pk"))["value"] or 0
+    largest_id = (
+        uploads.filter(public_id__regex=rf"^{PREFIX}[0-9]+$")
+        .aggregate(value=Max(Cast(Substr("public_id", len(PREFIX) + 1), BigIntegerField())))
+        ["value"]
+        or 0
+    )
+    return max(largest_pk, largest_id)
+
+
+def _bump(using: str, size: int) -> int:
+    """Advance the sequence by `size` and return the first reserved number."""
+
+    sequence = PublicIdSequence.objects.using(using).filter(name=SEQUENCE)
+    if not sequence.update(next_value=F("next_value") + size):
+        try:
+            with transaction.atomic(using=using):
+                PublicIdSequence.objects.using(using).create(
+                    name=SEQUENCE, next_value=high_water(using) + 1
+                )
+        except IntegrityError:
+            pass  # another process seeded it first
+        sequence.update(next_value=F("next_value") + size)
+    return sequence.values_list("next_value", flat=True).get() - size
+
+
+class Allocator:
+    def __init__(self):
+        self._local = threading.local()
+
+    def _block(self, using: str, connection) -> Optional[Block]:
+        block = getattr(self._local, using, None)
+        if block is None or block.pid != os.getpid() or block.next >= block.end:
+            return None
+        if block.hook is not None and not _hook_pending(connection, block.hook):
+            return None
+        return block
+
+    def _reserve(self, using: str, connection, size: int) -> Block:
+        if connection.in_atomic_block:
+            start = _bump(using, size)
+            block = Block(start, start + size)
+            block.hook = functools.partial(_confirm, block)
+            transaction.on_commit(block.hook, using=using)
+        else:
+            with transaction.atomic(using=using):
+                start = _bump(using, size)
+            block = Block(start, start + size)
+        setattr(self._local, using, block)
+        return block
+
+    def allocate(self, count: int = 1, using: str = DEFAULT_DB_ALIAS) -> List[int]:
+        connection = connections[using]
+        numbers: List[int] = []
+        while len(numbers) < count:
+            block = self._block(using, connection) or self._reserve(
+                using, connection, max(block_size(), count - len(numbers))
+            )
+            take = min(block.end - block.next, count - len(numbers))
+            numbers.extend(range(block.next, block.next + take))
+            block.next += take
+        return numbers
+
+    def reset(self) -> None:
+        self._local = threading.local()
+
+
+allocator = Allocator()
+
+
+def allocate(count: int, using: str = DEFAULT_DB_ALIAS) -> List[str]:
+    return [f"{PREFIX}{number}" for number in allocator.allocate(count, using)]
+
+
+def next_public_id(using: str = DEFAULT_DB_ALIAS) -> str:
+    return allocate(1, using)[0]
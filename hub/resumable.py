@@ -0,0 +1,147 @@
+"""
+Disk side of resumable uploads.
+
+Each `UploadSession` owns `MEDIA_ROOT/uploads/.sessions/<id>/`, holding one
+`<index>.part` file per received chunk. Chunks are written to a temp name and
+renamed into place, so a part file only exists once it is complete and a
+client may retry any chunk safely. Finalizing concatenates the parts into the
+regular `uploads/` storage with `os.copy_file_range`, letting the kernel move
+the bytes without copying them through Python.
+"""
+
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import List, Tuple
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from .models import UploadSession
+from .uploadhandlers import SNIFF_BYTES, sniff_kind
+
+COPY_BLOCK = 8 * 1024 * 1024
+READ_BLOCK = 64 * 1024
+
+
+class ChunkError(ValueError):
+    pass
+
+
+def session_dir(session: UploadSession) -> Path:
+    return Path(settings.MEDIA_ROOT) / "uploads" / ".sessions" / str(session.pk)
+
+
+def _part_path(session: UploadSession, index: int) -> Path:
+    return session_dir(session) / f"{index:06d}.part"
+
+
+def write_chunk(session: UploadSession, index: int, stream) -> int:
+    """Stream one chunk from `stream` to disk; returns the bytes written."""
+
+    if not 0 <= index < session.total_chunks:
+        raise ChunkError(f"Chunk index must be between 0 and {session.total_chunks - 1}.")
+    expected = session.expected_chunk_size(index)
+    directory = session_dir(session)
+    directory.mkdir(parents=True, exist_ok=True)
+    final = _part_path(session, index)
+    # Unique per call: threads of one process may receive the same chunk.
+    temp = final.with_name(f"{final.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+    written = 0
+    head = b""
+    try:
+        with open(temp, "wb") as handle:
+            while True:
+                block = stream.read(READ_BLOCK)
+                if not block:
+                    break
+                if index == 0 and len(head) < SNIFF_BYTES:
+                    head += block[:SNIFF_BYTES - len(head)]
+                written += len(block)
+                if written > expected:
+                    raise ChunkError(f"Chunk {index} must be {expected} bytes.")
+                handle.write(block)
+        if written != expected:
+            raise ChunkError(f"Chunk {index} must be {expected} bytes, received {written}.")
+        if index == 0 and sniff_kind(head) != session.file_type:
+            raise ChunkError(f"The uploaded file is not a valid {session.file_type}.")
+        os.replace(temp, final)
+    finally:
+        if temp.exists():
+            temp.unlink()
+    return written
+
+
+def received_chunks(session: UploadSession) -> List[int]:
+    directory = session_dir(session)
+    if not directory.is_dir():
+        return []
+    return sorted(
+        int(entry.name.split(".", 1)[0])
+        for entry in os.scandir(directory)
+        if entry.name.endswith(".part")
+    )
+
+
+def as_ranges(indexes: List[int]) -> List[Tuple[int, int]]:
+    """Collapse sorted chunk indexes into inclusive (first, last) runs."""
+
+    ranges: List[Tuple[int, int]] = []
+    for index in indexes:
+        if ranges and ranges[-1][1] == index - 1:
+            ranges[-1] = (ranges[-1][0], index)
+        else:
+            ranges.append((index, index))
+    return ranges
+
+
+def missing_chunks(session: UploadSession) -> List[int]:
+    received = set(received_chunks(session))
+    return [index for index in range(session.total_chunks) if index not in received]
+
+
+def _concatenate(source, target, length: int) -> None:
+    remaining = length
+    try:
+        while remaining:
+            sent = os.copy_file_range(
+                source.fileno(), target.fileno(), min(remaining, COPY_BLOCK)
+            )
+            if not sent:
+                raise OSError("Unexpected end of chunk while assembling upload.")
+            remaining -= sent
+    except (AttributeError, OSError):
+        # Platforms or filesystems without copy_file_range fall back to a
+        # buffered copy, as long as nothing has been moved for this part yet.
+        if remaining != length:
+            raise
+        shutil.copyfileobj(source, target, COPY_BLOCK)
+        target.flush()
+
+
+def assemble(session: UploadSession) -> Tuple[str, str]:
+    """
+    Concatenate every chunk into a new file under `uploads/`. Returns the
+    storage name and the SHA-256 of the assembled content.
+    """
+
+    name = default_storage.get_available_name(f"uploads/{Path(session.file_name).name}")
+    target_path = Path(default_storage.path(name))
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(target_path, "xb") as target:
+        for index in range(session.total_chunks):
+            part = _part_path(session, index)
+            with open(part, "rb") as source:
+                _concatenate(source, target, part.stat().st_size)
+
+    digest = hashlib.sha256()
+    with open(target_path, "rb") as assembled:
+        for block in iter(lambda: assembled.read(COPY_BLOCK), b""):
+            digest.update(block)
+    return name, digest.hexdigest()
+
+
+def discard(session: UploadSession) -> None:
+    shutil.rmtree(session_dir(session), ignore_errors=True)
@@ -0,0 +1,307 @@
+"""
+Maintained summary tables for the dashboard pages.
+
+Every saved or deleted `Project` applies a small delta to its contributor's
+rollup, the global rollup, the rollup for its idea and the rollup for the
+month it was uploaded in (see `hub.signals`). Uploads still waiting for a
+prediction, or whose scoring job failed, count towards `uploads` but not
+towards `scored` or `confidence_total`, so averages cover scored uploads only.
+Pages then read totals and averages from a single row instead of
+aggregating `hub_upload` on each request. `rebuild()` recomputes everything
+from scratch and `find_drift()` reports rows that no longer match the source
+table; both back the `rebuild_rollups` management command.
+"""
+
+import asyncio
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Sum
+from django.db.models.functions import Cast, TruncMonth
+from django.utils import timezone
+
+from . import caching
+from .models import IdeaRollup, MonthlyRollup, Project, ProjectRollup
+
+ZERO = Decimal("0.00")
+PENDING = "Pending"
+SCORED = ~Q(verdict=PENDING)
+
+
+def as_decimal(value) -> Decimal:
+    if value is None:
+        return ZERO
+    return Decimal(str(value)).quantize(Decimal("0.01"))
+
+
+def contribution(verdict: str, confidence) -> Tuple[int, Decimal]:
+    """The (scored, confidence) an upload adds to its rollups."""
+
+    if verdict == PENDING:
+        return 0, ZERO
+    return 1, as_decimal(confidence)
+
+
+def _bump(model, lookup: Dict[str, object], uploads: int, scored: int, confidence: Decimal) -> None:
+    changes = {
+        "uploads": F("uploads") + uploads,
+        "scored": F("scored") + scored,
+        "confidence_total": F("confidence_total") + confidence,
+    }
+    if model is ProjectRollup:
+        # QuerySet.update() skips auto_now; the API's Last-Modified reads it.
+        changes["updated_at"] = timezone.now()
+    if not model.objects.filter(**lookup).update(**changes):
+        model.objects.get_or_create(**lookup)
+        model.objects.filter(**lookup).update(**changes)
+
+
+def month_of(moment) -> date:
+    """First day of the month `moment` falls in, in the current time zone."""
+
+    return timezone.localtime(moment).date().replace(day=1)
+
+
+def record(
+    user_id: int,
+    idea: str,
+    uploads: int = 0,
+    confidence=ZERO,
+    month: Optional[date] = None,
+    scored: int = 0,
+) -> None:
+    """Apply an upload/scored/confidence delta to the user, global, idea and month rollups."""
+
+    confidence = as_decimal(confidence)
+    if not uploads and not scored and not confidence:
+        return
+    for scope in (ProjectRollup.scope_for(user_id), ProjectRollup.GLOBAL_SCOPE):
+        _bump(ProjectRollup, {"scope": scope}, uploads, scored, confidence)
+    _bump(IdeaRollup, {"idea": idea}, uploads, scored, confidence)
+    if month is not None:
+        _bump(MonthlyRollup, {"month": month}, uploads, scored, confidence)
+    if uploads < 0:
+        IdeaRollup.objects.filter(idea=idea, uploads__lte=0).delete()
+        if month is not None:
+            MonthlyRollup.objects.filter(month=month, uploads__lte=0).delete()
+
+
+def record_many(projects: Iterable[Project]) -> None:
+    """
+    Add freshly inserted uploads to the rollups in one bump per touched row,
+    for bulk inserts that bypass the `post_save` signal.
+    """
+
+    deltas: Dict[Tuple[type, str, object], List] = {}
+    for project in projects:
+        scored, confidence = contribution(project.verdict, project.prediction_confidence)
+        keys = (
+            (ProjectRollup, "scope", ProjectRollup.scope_for(project.user_id)),
+            (ProjectRollup, "scope", ProjectRollup.GLOBAL_SCOPE),
+            (IdeaRollup, "idea", project.idea),
+            (MonthlyRollup, "month", month_of(project.created_at)),
+        )
+        for key in keys:
+            delta = deltas.setdefault(key, [0, 0, ZERO])
+            delta[0] += 1
+            delta[1] += scored
+            delta[2] += confidence
+    for (model, field, value), (uploads, scored, confidence) in deltas.items():
+        _bump(model, {field: value}, uploads, scored, confidence)
+    caching.invalidate_all()
+
+
+def summary_for(user=None) -> ProjectRollup:
+    """Return the rollup for a contributor, or the global one for `None`."""
+
+    scope = ProjectRollup.scope_for(user)
+    return ProjectRollup.objects.filter(scope=scope).first() or ProjectRollup(scope=scope)
+
+
+async def asummary_for(user=None) -> ProjectRollup:
+    scope = ProjectRollup.scope_for(user)
+    return await ProjectRollup.objects.filter(scope=scope).afirst() or ProjectRollup(scope=scope)
+
+
+def _recent_uploads(user=None):
+    uploads = Project.objects.all() if user is None else Project.objects.filter(user=user)
+    return uploads.filter(created_at__gte=timezone.now() - timedelta(days=7))
+
+
+def _summary(rollup: ProjectRollup, recent: int, ideas) -> Dict[str, object]:
+    return {
+        "avg_confidence": rollup.avg_confidence,
+        "uploads": rollup.uploads,
+        "recent": recent,
+        "idea_stats": ideas,
+    }
+
+
+def dashboard_summary(user=None) -> Dict[str, object]:
+    """Summary card values for a contributor, or for every upload with `None`."""
+
+    return _summary(
+        summary_for(user),
+        _recent_uploads(user).count(),
+        idea_stats() if user is None else None,
+    )
+
+
+async def adashboard_summary(user=None) -> Dict[str, object]:
+    """`dashboard_summary` for async views, with its three reads gathered."""
+
+    async def no_ideas():
+        return None
+
+    rollup, recent, ideas = await asyncio.gather(
+        asummary_for(user),
+        _recent_uploads(user).acount(),
+        aidea_stats() if user is None else no_ideas(),
+    )
+    return _summary(rollup, recent, ideas)
+
+
+def _idea_stats_rows():
+    return (
+        IdeaRollup.objects.filter(scored__gt=0)
+        .annotate(avg_conf=Cast("confidence_total", FloatField()) / F("scored"))
+        .order_by("-avg_conf")
+        .values("idea", "avg_conf", total=F("uploads"))
+    )
+
+
+def idea_stats() -> List[Dict[str, object]]:
+    """Per-idea averages in the shape the statistics template expects."""
+
+    return list(_idea_stats_rows())
+
+
+async def aidea_stats() -> List[Dict[str, object]]:
+    return [row async for row in _idea_stats_rows()]
+
+
+def _month_rows(years: List[int]):
+    return MonthlyRollup.objects.filter(
+        month__gte=date(min(years), 1, 1), month__lte=date(max(years), 12, 1)
+    )
+
+
+def month_totals(years: Iterable[int]) -> Dict[Tuple[int, int], MonthlyRollup]:
+    """Month rollups for every month of `years` in one query, keyed by (year, month)."""
+
+    years = list(years)
+    if not years:
+        return {}
+    return {(row.month.year, row.month.month): row for row in _month_rows(years)}
+
+
+async def amonth_totals(years: Iterable[int]) -> Dict[Tuple[int, int], MonthlyRollup]:
+    years = list(years)
+    if not years:
+        return {}
+    return {(row.month.year, row.month.month): row async for row in _month_rows(years)}
+
+
+Totals = Tuple[int, int, Decimal]
+
+
+def _totals():
+    return {
+        "uploads": Count("id"),
+        "scored": Count("id", filter=SCORED),
+        "confidence": Sum("prediction_confidence", filter=SCORED),
+    }
+
+
+def _row_totals(row) -> Totals:
+    return row["uploads"], row["scored"], as_decimal(row["confidence"])
+
+
+def _expected_months() -> Dict[date, Totals]:
+    return {
+        row["month"].date(): _row_totals(row)
+        for row in Project.objects.order_by()
+        .annotate(month=TruncMonth("created_at"))
+        .values("month")
+        .annotate(**_totals())
+    }
+
+
+def _expected() -> Tuple[Dict[str, Totals], Dict[str, Totals]]:
+    scopes = {
+        ProjectRollup.scope_for(row["user_id"]): _row_totals(row)
+        for row in Project.objects.order_by().values("user_id").annotate(**_totals())
+    }
+    scopes[ProjectRollup.GLOBAL_SCOPE] = _row_totals(Project.objects.aggregate(**_totals()))
+    ideas = {
+        row["idea"]: _row_totals(row)
+        for row in Project.objects.order_by().values("idea").annotate(**_totals())
+    }
+    return scopes, ideas
+
+
+def rebuild() -> Tuple[int, int, int]:
+    """Recompute every rollup row from `hub_upload`."""
+
+    scopes, ideas = _expected()
+    months = _expected_months()
+    with transaction.atomic():
+        ProjectRollup.objects.all().delete()
+        IdeaRollup.objects.all().delete()
+        MonthlyRollup.objects.all().delete()
+        ProjectRollup.objects.bulk_create(
+            ProjectRollup(scope=scope, uploads=uploads, scored=scored, confidence_total=confidence)
+            for scope, (uploads, scored, confidence) in scopes.items()
+        )
+        IdeaRollup.objects.bulk_create(
+            (
+                IdeaRollup(idea=idea, uploads=uploads, scored=scored, confidence_total=confidence)
+                for idea, (uploads, scored, confidence) in ideas.items()
+            ),
+            batch_size=500,
+        )
+        MonthlyRollup.objects.bulk_create(
+            MonthlyRollup(month=month, uploads=uploads, scored=scored, confidence_total=confidence)
+            for month, (uploads, scored, confidence) in months.items()
+        )
+    caching.invalidate_all()
+    return len(scopes), len(ideas), len(months)
+
+
+def _diff(label: str, expected, stored) -> List[str]:
+    drift = []
+    for key in sorted(set(expected) | set(stored)):
+        want = expected.get(key, (0, 0, ZERO))
+        have = stored.get(key, (0, 0, ZERO))
+        if want != have:
+            drift.append(
+                f"{label} {key!r}: expected {want[0]} uploads ({want[1]} scored) / {want[2]}, "
+                f"found {have[0]} uploads ({have[1]} scored) / {have[2]}"
+            )
+    return drift
+
+
+def find_drift(limit: Optional[int] = None) -> List[str]:
+    """Describe rollup rows that disagree with a fresh aggregation."""
+
+    scopes, ideas = _expected()
+    stored_scopes = {
+        row.scope: (row.uploads, row.scored, as_decimal(row.confidence_total))
+        for row in ProjectRollup.objects.all()
+    }
+    stored_ideas = {
+        row.idea: (row.uploads, row.scored, as_decimal(row.confidence_total))
+        for row in IdeaRollup.objects.all()
+    }
+    stored_months = {
+        row.month: (row.uploads, row.scored, as_decimal(row.confidence_total))
+        for row in MonthlyRollup.objects.all()
+    }
+    drift = (
+        _diff("scope", scopes, stored_scopes)
+        + _diff("idea", ideas, stored_ideas)
+        + _diff("month", _expected_months(), stored_months)
+    )
+    return drift[:limit] if limit else drift
@@ -0,0 +1,93 @@
+"""
+Read-replica routing for the read-only report and statistics views.
+
+`DATABASE_REPLICA_URLS` (see `MET/database.py`) adds `replica`, `replica_2`,
+... aliases and lists them in `settings.DATABASE_REPLICAS`. Routing is opt-in
+per view: only code running under `@read_from_replica` (or inside
+`use_replica()`) sends its reads to a replica, picked at random per request.
+Everything else, including every write and the reads that follow a write in
+the same request, stays on `default`. The choice lives in a context variable,
+so it follows async views into `sync_to_async` threads and
+`asyncio.gather` tasks.
+
+Replicas lag the primary, so results read there are never stored in the
+shared summary cache (see `hub.caching.fragment`).
+"""
+
+import contextlib
+import contextvars
+import functools
+import random
+from typing import Iterator, List, Optional
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_replica: contextvars.ContextVar = contextvars.ContextVar("hub_read_replica", default=None)
+
+
+def replicas() -> List[str]:
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+def current_replica() -> Optional[str]:
+    return _replica.get()
+
+
+@contextlib.contextmanager
+def use_replica(alias: Optional[str] = None) -> Iterator[Optional[str]]:
+    """Route reads in this block to `alias`, or a random replica; a no-op without replicas."""
+
+    alias = alias or (random.choice(replicas()) if replicas() else None)
+    token = _replica.set(alias)
+    try:
+        yield alias
+    finally:
+        _replica.reset(token)
+
+
+def read_from_replica(view):
+    if iscoroutinefunction(view):
+
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            with use_replica():
+                return await view(request, *args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with use_replica():
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        # Reads after a write must see it: pin them to the primary until the
+        # enclosing use_replica() block exits.
+        if _replica.get() is not None:
+            _replica.set(None)
+        # An object read from a replica is saved to the primary.
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db in replicas():
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        pool = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas():
+            return False
+        return None
@@ -0,0 +1,203 @@
+"""
+Full-text search over uploads for the dashboard search box.
+
+On SQLite the idea, public ID and file name of every upload are mirrored into
+the FTS5 table `hub_upload_search` (rowid = upload id), kept in sync by the
+`Project` save/delete signals. Queries match every word as a prefix and rank
+results by bm25, so a search is an index lookup instead of three
+`LIKE '%x%'` scans of `hub_upload`.
+
+Other databases, and SQLite builds without FTS5, fall back to the previous
+`icontains` filter until they get a native backend (PostgreSQL `tsvector`
+plus trigram is the intended next one). `rebuild()` repopulates the index
+from scratch and backs the `rebuild_search_index` command.
+"""
+
+import re
+from pathlib import PurePosixPath
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+
+INDEX_TABLE = "hub_upload_search"
+SOURCE_TABLE = "hub_upload"
+REBUILD_BATCH = 5000
+
+WORD = re.compile(r"\w+", re.UNICODE)
+TRAILING_DIGITS = re.compile(r"(\d+)$")
+
+Document = Tuple[int, str, str, str]
+
+# Whether each connection alias's SQLite library was built with FTS5.
+_fts5: Dict[str, bool] = {}
+
+
+def search_terms(query: str) -> List[str]:
+    return WORD.findall(query or "")
+
+
+def document(pk: int, idea: str, public_id: Optional[str], file_name: str) -> Document:
+    """
+    The indexed row for one upload. Public IDs are indexed with their numeric
+    part as a separate word so "1042" finds "ID1042", and stored files are
+    indexed by base name so the shared `uploads/` prefix does not match
+    everything.
+    """
+
+    public_id = public_id or f"ID{pk}"
+    digits = TRAILING_DIGITS.search(public_id)
+    if digits:
+        public_id = f"{public_id} {digits.group(1)}"
+    file_name = file_name or ""
+    if not re.match(r"^[a-z][a-z0-9+.-]*://", file_name, re.IGNORECASE):
+        file_name = PurePosixPath(file_name).name
+    return pk, idea or "", public_id, file_name
+
+
+class LikeSearchBackend:
+    """Unindexed fallback: the original case-insensitive substring filter."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    @classmethod
+    def available(cls, connection) -> bool:
+        return True
+
+    def install(self) -> None:
+        pass
+
+    def uninstall(self) -> None:
+        pass
+
+    def index(self, documents: Iterable[Document]) -> None:
+        pass
+
+    def remove(self, pks: Iterable[int]) -> None:
+        pass
+
+    def rebuild(self) -> int:
+        return 0
+
+    def filter(self, queryset, query: str):
+        return queryset.filter(
+            Q(idea__icontains=query) | Q(public_id__icontains=query) | Q(file_name__icontains=query)
+        )
+
+
+class SqliteSearchBackend(LikeSearchBackend):
+    @classmethod
+    def available(cls, connection) -> bool:
+        if connection.alias not in _fts5:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+                _fts5[connection.alias] = bool(cursor.fetchone()[0])
+        return _fts5[connection.alias]
+
+    def install(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5("
+                "idea, public_id, file_name, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+
+    def uninstall(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {INDEX_TABLE}")
+
+    def index(self, documents: Iterable[Document]) -> None:
+        documents = list(documents)
+        if not documents:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {INDEX_TABLE} (rowid, idea, public_id, file_name) "
+                "VALUES (%s, %s, %s, %s)",
+                documents,
+            )
+
+    def remove(self, pks: Iterable[int]) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {INDEX_TABLE} WHERE rowid = %s", [(pk,) for pk in pks]
+            )
+
+    def rebuild(self) -> int:
+        self.install()
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {INDEX_TABLE}")
+        total = 0
+        last_pk = 0
+        while True:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT id, idea, public_id, file_name FROM {SOURCE_TABLE} "
+                    "WHERE id > %s ORDER BY id LIMIT %s",
+                    [last_pk, REBUILD_BATCH],
+                )
+                rows = cursor.fetchall()
+            if not rows:
+                break
+            self.index(document(*row) for row in rows)
+            total += len(rows)
+            last_pk = rows[-1][0]
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {INDEX_TABLE} ({INDEX_TABLE}) VALUES ('optimize')")
+        return total
+
+    def filter(self, queryset, query: str):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+        # Every word must match, each as a prefix: "pho inv" -> "pho"* "inv"*
+        expression = " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        column = f'"{queryset.model._meta.db_table}"."id"'
+        # Joined rather than filtered with a subquery, so the index is
+        # searched once and its bm25 rank comes from the same MATCH.
+        return queryset.extra(
+            select={"search_rank": f"{INDEX_TABLE}.rank"},
+            tables=[INDEX_TABLE],
+            where=[f"{INDEX_TABLE}.rowid = {column}", f"{INDEX_TABLE} MATCH %s"],
+            params=[expression],
+        ).order_by("search_rank", "-created_at")
+
+
+BACKENDS = {
+    "sqlite": SqliteSearchBackend,
+}
+
+
+def backend(using: str = DEFAULT_DB_ALIAS) -> LikeSearchBackend:
+    connection = connections[using]
+    backend_class = BACKENDS.get(connection.vendor, LikeSearchBackend)
+    if not backend_class.available(connection):
+        backend_class = LikeSearchBackend
+    return backend_class(connection)
+
+
+def index_project(project, using: str = DEFAULT_DB_ALIAS) -> None:
+    backend(using).index(
+        [document(project.pk, project.idea, project.public_id, project.file_name)]
+    )
+
+
+def remove_project(pk: int, using: str = DEFAULT_DB_ALIAS) -> None:
+    backend(using).remove([pk])
+
+
+def matching(queryset, query: str):
+    """Restrict `queryset` to uploads matching `query`, best matches first."""
+
+    return backend(queryset.db).filter(queryset, query)
+
+
+def rebuild(using: str = DEFAULT_DB_ALIAS) -> int:
+    return backend(using).rebuild()
+
+
+def install(sender=None, using: str = DEFAULT_DB_ALIAS, **kwargs) -> None:
+    """Create the index if it is missing; also connected to `post_migrate`."""
+
+    backend(using).install()
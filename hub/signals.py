@@ -0,0 +1,100 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import caching, jobs, rollups, search, timeseries
+from .models import Project, Statistic
+
+
+@receiver(pre_save, sender=Project)
+def remember_rollup_state(sender, instance, raw=False, **kwargs):
+    """Capture the stored values so post_save can move them between rollups."""
+
+    instance._rollup_previous = None
+    if raw or instance.pk is None:
+        return
+    instance._rollup_previous = (
+        Project.objects.filter(pk=instance.pk)
+        .values_list("user_id", "idea", "verdict", "prediction_confidence")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Project)
+def update_rollups_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_rollup_previous", None)
+    instance._rollup_previous = None
+    current = (instance.user_id, instance.idea)
+    scored, confidence = rollups.contribution(instance.verdict, instance.prediction_confidence)
+    # created_at never changes after insert, so the month bucket stays put.
+    month = rollups.month_of(instance.created_at)
+    if created or previous is None:
+        rollups.record(*current, 1, confidence, month, scored)
+        return
+    was_scored, was_confidence = rollups.contribution(previous[2], previous[3])
+    if previous[:2] == current:
+        rollups.record(*current, 0, confidence - was_confidence, month, scored - was_scored)
+    else:
+        rollups.record(*previous[:2], -1, -was_confidence, month, -was_scored)
+        rollups.record(*current, 1, confidence, month, scored)
+        if previous[0] != current[0]:
+            caching.invalidate(previous[0])
+
+
+@receiver(post_save, sender=Project)
+def queue_thumbnail(sender, instance, created, raw=False, **kwargs):
+    if raw or not created or not instance.file or instance.file_type == "link":
+        return
+    transaction.on_commit(lambda: jobs.enqueue(instance, "thumbnail"))
+
+
+@receiver(post_save, sender=Project)
+def invalidate_summary_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    caching.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=Project)
+def update_search_index(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    search.index_project(instance, using)
+
+
+@receiver(post_delete, sender=Project)
+def invalidate_summary_on_delete(sender, instance, **kwargs):
+    caching.invalidate(instance.user_id)
+
+
+@receiver(post_delete, sender=Project)
+def remove_from_search_index(sender, instance, using=None, **kwargs):
+    search.remove_project(instance.pk, using)
+
+
+@receiver(post_delete, sender=Project)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    scored, confidence = rollups.contribution(instance.verdict, instance.prediction_confidence)
+    rollups.record(
+        instance.user_id,
+        instance.idea,
+        -1,
+        -confidence,
+        rollups.month_of(instance.created_at),
+        -scored,
+    )
+
+
+@receiver(post_delete, sender=Project)
+def remove_statistic_rollups(sender, instance, **kwargs):
+    timeseries.remove_project(instance.pk)
+
+
+@receiver(post_save, sender=Statistic)
+def record_statistic(sender, instance, created, raw=False, using=None, **kwargs):
+    # Points are append-only: edits to a saved point do not move its rollups.
+    if raw or not created:
+        return
+    timeseries.record([instance], using)
@@ -0,0 +1,5 @@
+"""
+SQLite database backend tuned for several Gunicorn workers sharing one file.
+
+Use it with `'ENGINE': 'hub.sqlite'`; see `base.DatabaseWrapper`.
+"""
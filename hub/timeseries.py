@@ -0,0 +1,281 @@
+"""
+Time series over `Statistic` points.
+
+Every recorded point is added to `StatisticRollup` rows for its minute, hour
+and day bucket, both for its upload and globally (see `record()`, called by
+the `Statistic` post_save signal and by `ingest()` for bulk loads). `series()`
+then reads one row per bucket instead of scanning raw points. `downsample()`
+deletes raw points, and finer rollups, once they are older than
+`STATISTIC_RETENTION_DAYS`; it backs the `downsample_statistics` command.
+Deleting an upload removes its rollups and its share of the global ones
+(`remove_project()`).
+
+On SQLite and PostgreSQL a batch of rollup deltas is written with a single
+`INSERT ... ON CONFLICT DO UPDATE` statement; other databases fall back to
+one UPDATE (or INSERT) per bucket.
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Exists, F, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+from .models import Statistic, StatisticRollup
+
+RESOLUTIONS = ("minute", "hour", "day")
+DEFAULT_RETENTION_DAYS = {"raw": 30, "minute": 2, "hour": 90, "day": None}
+INGEST_BATCH = 1000
+DELETE_BATCH = 5000
+UPSERT_VENDORS = {"sqlite", "postgresql"}
+
+Key = Tuple[str, str, str, datetime]
+
+
+def bucket_of(moment: datetime, resolution: str) -> datetime:
+    """Start of the `resolution` bucket `moment` falls in, in the current time zone."""
+
+    local = timezone.localtime(moment).replace(second=0, microsecond=0)
+    if resolution in ("hour", "day"):
+        local = local.replace(minute=0)
+    if resolution == "day":
+        local = local.replace(hour=0)
+    return local
+
+
+def _as_decimal(value) -> Decimal:
+    return Decimal(str(value)).quantize(Decimal("0.01"))
+
+
+def _deltas(statistics: Iterable[Statistic]) -> Dict[Key, List]:
+    deltas: Dict[Key, List] = {}
+    for statistic in statistics:
+        value = _as_decimal(statistic.metric_value)
+        scopes = (
+            StatisticRollup.scope_for(statistic.project_id),
+            StatisticRollup.GLOBAL_SCOPE,
+        )
+        for resolution in RESOLUTIONS:
+            bucket = bucket_of(statistic.recorded_at, resolution)
+            for scope in scopes:
+                delta = deltas.get((resolution, scope, statistic.metric_name, bucket))
+                if delta is None:
+                    deltas[(resolution, scope, statistic.metric_name, bucket)] = [1, value, value, value]
+                else:
+                    delta[0] += 1
+                    delta[1] += value
+                    delta[2] = min(delta[2], value)
+                    delta[3] = max(delta[3], value)
+    return deltas
+
+
+def _upsert(using: str, deltas: Dict[Key, List]) -> None:
+    connection = connections[using]
+    table = connection.ops.quote_name(StatisticRollup._meta.db_table)
+    rows = [
+        (
+            resolution,
+            scope,
+            metric_name,
+            connection.ops.adapt_datetimefield_value(bucket),
+            points,
+            connection.ops.adapt_decimalfield_value(total, 18, 2),
+            connection.ops.adapt_decimalfield_value(minimum, 10, 2),
+            connection.ops.adapt_decimalfield_value(maximum, 10, 2),
+        )
+        for (resolution, scope, metric_name, bucket), (points, total, minimum, maximum) in deltas.items()
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} "
+            "(resolution, scope, metric_name, bucket, points, total, minimum, maximum) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s) "
+            "ON CONFLICT (resolution, scope, metric_name, bucket) DO UPDATE SET "
+            f"points = {table}.points + excluded.points, "
+            f"total = {table}.total + excluded.total, "
+            f"minimum = CASE WHEN excluded.minimum < {table}.minimum "
+            f"THEN excluded.minimum ELSE {table}.minimum END, "
+            f"maximum = CASE WHEN excluded.maximum > {table}.maximum "
+            f"THEN excluded.maximum ELSE {table}.maximum END",
+            rows,
+        )
+
+
+def _bump(using: str, deltas: Dict[Key, List]) -> None:
+    rollups = StatisticRollup.objects.using(using)
+    for (resolution, scope, metric_name, bucket), (points, total, minimum, maximum) in deltas.items():
+        lookup = {"resolution": resolution, "scope": scope, "metric_name": metric_name, "bucket": bucket}
+        changes = {
+            "points": F("points") + points,
+            "total": F("total") + total,
+            "minimum": Least(F("minimum"), Value(minimum)),
+            "maximum": Greatest(F("maximum"), Value(maximum)),
+        }
+        if not rollups.filter(**lookup).update(**changes):
+            _, created = rollups.get_or_create(
+                **lookup,
+                defaults={"points": points, "total": total, "minimum": minimum, "maximum": maximum},
+            )
+            if not created:
+                rollups.filter(**lookup).update(**changes)
+
+
+def record(statistics: Iterable[Statistic], using: str = DEFAULT_DB_ALIAS) -> None:
+    """Add saved points to their minute, hour and day rollups."""
+
+    deltas = _deltas(statistics)
+    if not deltas:
+        return
+    if connections[using].vendor in UPSERT_VENDORS:
+        _upsert(using, deltas)
+    else:
+        _bump(using, deltas)
+
+
+def ingest(points: Iterable[Dict[str, object]], batch_size: int = INGEST_BATCH) -> int:
+    """
+    Append points in batches: one `bulk_create` and one rollup write per
+    batch. Each point is a dict with `project` (an upload or its id),
+    `metric_name`, `metric_value` and optionally `recorded_at` and `notes`.
+    Returns the number of points stored.
+    """
+
+    stored = 0
+    batch: List[Statistic] = []
+
+    def flush():
+        with transaction.atomic():
+            Statistic.objects.bulk_create(batch, batch_size=batch_size)
+            record(batch)
+        return len(batch)
+
+    for point in points:
+        project = point["project"]
+        batch.append(
+            Statistic(
+                project_id=getattr(project, "pk", project),
+                metric_name=point["metric_name"],
+                metric_value=_as_decimal(point["metric_value"]),
+                recorded_at=point.get("recorded_at") or timezone.now(),
+                notes=point.get("notes", ""),
+            )
+        )
+        if len(batch) >= batch_size:
+            stored += flush()
+            batch = []
+    if batch:
+        stored += flush()
+    return stored
+
+
+def series(
+    metric_name: str,
+    project=None,
+    resolution: str = "hour",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[Dict[str, object]]:
+    """
+    One entry per non-empty bucket of `metric_name`, oldest first, for an
+    upload or across all uploads (`project=None`), from the rollups alone.
+    """
+
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {', '.join(RESOLUTIONS)}.")
+    rows = StatisticRollup.objects.filter(
+        resolution=resolution,
+        scope=StatisticRollup.scope_for(project),
+        metric_name=metric_name,
+    )
+    if start is not None:
+        rows = rows.filter(bucket__gte=bucket_of(start, resolution))
+    if end is not None:
+        rows = rows.filter(bucket__lt=end)
+    return [
+        {
+            "bucket": row.bucket,
+            "points": row.points,
+            "average": row.average,
+            "minimum": row.minimum,
+            "maximum": row.maximum,
+            "total": row.total,
+        }
+        for row in rows.order_by("bucket")
+    ]
+
+
+def retention() -> Dict[str, Optional[int]]:
+    return {**DEFAULT_RETENTION_DAYS, **getattr(settings, "STATISTIC_RETENTION_DAYS", {})}
+
+
+def _delete_in_batches(queryset) -> int:
+    # Short transactions: a long DELETE would block writers on SQLite.
+    deleted = 0
+    while True:
+        pks = list(queryset.order_by().values_list("pk", flat=True)[:DELETE_BATCH])
+        if not pks:
+            return deleted
+        deleted += queryset.model.objects.filter(pk__in=pks).delete()[0]
+
+
+def expired(now: Optional[datetime] = None) -> Dict[str, object]:
+    """Querysets of the raw points and rollups past their retention, by level."""
+
+    now = now or timezone.now()
+    querysets = {}
+    for level, days in retention().items():
+        if days is None:
+            continue
+        cutoff = now - timedelta(days=days)
+        if level == "raw":
+            querysets[level] = Statistic.objects.filter(recorded_at__lt=cutoff)
+        else:
+            querysets[level] = StatisticRollup.objects.filter(resolution=level, bucket__lt=cutoff)
+    return querysets
+
+
+def downsample(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Delete raw points and rollups older than their retention; returns counts."""
+
+    return {level: _delete_in_batches(queryset) for level, queryset in expired(now).items()}
+
+
+def remove_project(project_id: int) -> None:
+    """
+    Drop a deleted upload's rollups and take its points back out of the
+    global ones. The upload's own rows are the source rather than its raw
+    points, which may already have been downsampled. A global bucket the
+    upload alone filled is deleted; the others get their minimum and maximum
+    recomputed from the remaining uploads' rows for the same bucket.
+    """
+
+    scope = StatisticRollup.scope_for(project_id)
+    own = StatisticRollup.objects.filter(scope=scope)
+    same_bucket = {
+        "resolution": OuterRef("resolution"),
+        "metric_name": OuterRef("metric_name"),
+        "bucket": OuterRef("bucket"),
+    }
+    mine = own.filter(**same_bucket)
+    others = (
+        StatisticRollup.objects.filter(**same_bucket)
+        .exclude(scope__in=(scope, StatisticRollup.GLOBAL_SCOPE))
+        .order_by()
+        .values("resolution")
+    )
+    with transaction.atomic():
+        shared = StatisticRollup.objects.filter(scope=StatisticRollup.GLOBAL_SCOPE).filter(Exists(mine))
+        shared.update(
+            points=F("points") - Subquery(mine.values("points")[:1]),
+            total=F("total") - Subquery(mine.values("total")[:1]),
+        )
+        shared.filter(points__lte=0).delete()
+        shared.update(
+            minimum=Coalesce(Subquery(others.annotate(value=Min("minimum")).values("value")), F("minimum")),
+            maximum=Coalesce(Subquery(others.annotate(value=Max("maximum")).values("value")), F("maximum")),
+        )
+        own.delete()
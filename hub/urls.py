@@ -1,29 +1,95 @@
+from django.conf import settings
 from django.urls import path
 from django.views.generic import RedirectView
 
+from . import api
+
 from .views import (
+    cache_stats_view,
     dashboard_view,
+    export_view,
     login_view,
     logout_view,
+    metrics_view,
     profile_view,
+    project_more_view,
     project_view,
     register_view,
+    reports_export_view,
+    reports_more_view,
     reports_view,
+    resumable_chunk_view,
+    resumable_finalize_view,
+    resumable_init_view,
+    resumable_status_view,
+    statistics_more_view,
     statistics_view,
     upload_delete_view,
+    upload_status_view,
     logo_view,
     poster_view,
     advertisement_view,
+    astatistics_view,
+    areports_view,
     welcome_view,
 )
 
+
+def read_view(sync_view, async_view):
+    """The async variant of a read-only view when ASYNC_VIEWS is enabled."""
+
+    return async_view if getattr(settings, "ASYNC_VIEWS", False) else sync_view
+
+
 urlpatterns = [
     path("", welcome_view, name="welcome"),
     path("dashboard/", dashboard_view, name="dashboard"),
     path("project/", project_view, name="project"),
-    path("statistics/", statistics_view, name="statistics"),
-    path("reports/", reports_view, name="reports"),
+    path("project/more/", project_more_view, name="project_more"),
+    path("statistics/", read_view(statistics_view, astatistics_view), name="statistics"),
+    path("statistics/more/", statistics_more_view, name="statistics_more"),
+    path("reports/", read_view(reports_view, areports_view), name="reports"),
+    path("reports/more/", reports_more_view, name="reports_more"),
+    path("reports/export/", reports_export_view, name="reports_export"),
+    path("exports/<str:dataset>/", export_view, name="export"),
+    path("cache/stats/", cache_stats_view, name="cache_stats"),
+    path("metrics/", metrics_view, name="metrics"),
+    path("api/v1/summary/", read_view(api.summary_view, api.asummary_view), name="api_summary"),
+    path("api/v1/ideas/", read_view(api.idea_stats_view, api.aidea_stats_view), name="api_ideas"),
+    path(
+        "api/v1/confidence/",
+        read_view(api.confidence_view, api.aconfidence_view),
+        name="api_confidence",
+    ),
+    path(
+        "api/v1/reports/monthly/",
+        read_view(api.monthly_report_view, api.amonthly_report_view),
+        name="api_monthly_report",
+    ),
+    path(
+        "api/v1/uploads/<int:pk>/",
+        read_view(api.upload_detail_view, api.aupload_detail_view),
+        name="api_upload",
+    ),
+    path(
+        "api/v1/statistics/<str:metric_name>/series/",
+        api.statistic_series_view,
+        name="api_statistic_series",
+    ),
     path("uploads/<int:pk>/delete/", upload_delete_view, name="upload_delete"),
+    path("uploads/<int:pk>/status/", upload_status_view, name="upload_status"),
+    path("uploads/resumable/", resumable_init_view, name="resumable_init"),
+    path("uploads/resumable/<uuid:session_id>/", resumable_status_view, name="resumable_status"),
+    path(
+        "uploads/resumable/<uuid:session_id>/chunks/<int:index>/",
+        resumable_chunk_view,
+        name="resumable_chunk",
+    ),
+    path(
+        "uploads/resumable/<uuid:session_id>/finalize/",
+        resumable_finalize_view,
+        name="resumable_finalize",
+    ),
     path("profile/", profile_view, name="profile"),
     path("logo/", logo_view, name="logo"),
     path("poster/", poster_view, name="poster"),
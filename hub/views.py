@@ -1,15 +1,40 @@
+import asyncio
+import calendar
+import functools
+import json
 from datetime import timedelta
-from typing import Dict
+from pathlib import Path
 
-from django.contrib import messages
+from django.conf import settings
+from django.contrib import admin, messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
+from django.core.files.storage import default_storage
+from django.db import transaction
 from django.db.models import Avg, Count, Q
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    JsonResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.defaultfilters import filesizeformat
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.http import require_http_methods, require_POST
 
+from . import audit, caching, dedup, exports, jobs, metrics, profiling, resumable, rollups, search
+from .async_utils import arender, async_login_required
 from .forms import CustomLoginForm, CustomRegistrationForm, UploadForm
-from .models import CustomUser, Project, UserLoginLog
+from .models import CustomUser, Project, UploadSession, UserLoginLog, month_bounds
+from .pagination import akeyset_page, keyset_page
+from .routers import read_from_replica
+from .uploadhandlers import evidence_uploads
 
 
 def register_view(request):
@@ -37,10 +62,10 @@ def login_view(request):
             messages.error(request, "Role mismatch. Please choose the correct role.")
         else:
             login(request, user)
-            # Log the login
+            # Buffered and written in batches by hub.audit
             ip = request.META.get('REMOTE_ADDR')
             user_agent = request.META.get('HTTP_USER_AGENT', '')
-            UserLoginLog.objects.create(user=user, ip_address=ip, user_agent=user_agent)
+            audit.record(user, ip_address=ip, user_agent=user_agent)
             return redirect("dashboard")
     return render(request, "auth/login.html", {"form": form})
 
@@ -53,87 +78,145 @@ def logout_view(request):
     return render(request, "auth/logout_confirm.html")
 
 
-def _predict_confidence(payload: Dict[str, str]) -> float:
-    """
-    Lightweight heuristic to mimic a prediction engine. It combines characters
-    from the idea, description, and file_type into a deterministic score so
-    admins can reason about reported values even without a model.
-    """
+def _report_month(request):
+    """The (year, month) a report asks for, defaulting to the current month."""
 
-    text = "".join(payload.values())
-    if not text:
-        return 50.0
-    base = sum(ord(c) for c in text)
-    confidence = 35 + (base % 66)  # keep between 35 and 100
-    return round(min(confidence, 99.9), 2)
+    now = timezone.now()
+    try:
+        year = int(request.GET.get('year', now.year))
+        month = int(request.GET.get('month', now.month))
+    except ValueError:
+        raise ValueError("Year and month must be numbers.")
+    if month_bounds(year, month) is None:
+        raise ValueError("Not a valid month.")
+    return year, month
 
 
-def _collect_dashboard_data(user: CustomUser, search_query=None):
-    is_admin = user.is_staff or user.role == "admin"
-    queryset = Project.objects.all() if is_admin else user.projects.all()
-    
-    if search_query:
-        queryset = queryset.filter(
-            Q(idea__icontains=search_query) |
-            Q(public_id__icontains=search_query) |
-            Q(file_name__icontains=search_query)
-        )
-    avg_confidence = queryset.aggregate(avg=Avg("prediction_confidence"))["avg"]
-    idea_stats = (
-        list(
-            Project.objects.values("idea").annotate(
-                avg_conf=Avg("prediction_confidence"),
-                total=Count("id"),
-            )
-            .order_by("-avg_conf")
-        )
-        if is_admin
-        else None
+def _monthly_queryset(year: int, month: int):
+    return Project.objects.created_in_month(year, month)
+
+
+CONFIDENCE_ORDER = "prediction_confidence"
+
+
+def _id_confidence_rows(queryset):
+    # Paged highest first by keyset_page(order_field=CONFIDENCE_ORDER).
+    return queryset.select_related("user").only("public_id", CONFIDENCE_ORDER, "user__username")
+
+
+def _search_summary(queryset, is_admin: bool):
+    # One conditional aggregation instead of an AVG, a COUNT and a filtered COUNT.
+    summary = queryset.aggregate(
+        avg_confidence=Avg("prediction_confidence", filter=rollups.SCORED),
+        uploads=Count("id"),
+        recent=Count("id", filter=Q(created_at__gte=timezone.now() - timedelta(days=7))),
     )
+    summary["idea_stats"] = rollups.idea_stats() if is_admin else None
+    return summary
+
+
+def _dashboard_context(user: CustomUser, is_admin: bool, queryset, summary, id_confidence):
+    """
+    Context shared by the dashboard pages. `summary` and `id_confidence` may
+    be lazy, and everything derived from them stays lazy, so a page only
+    queries for what its template reads: the dashboard and project pages
+    never touch the summary, and only the statistics page reads
+    `id_confidence`.
+    """
+
+    @functools.cache
+    def avg_confidence():
+        # A callable rather than a lazy object: templates call it on use, and
+        # number formatting needs the real Decimal.
+        value = summary["avg_confidence"]
+        return round(value, 2) if value else None
+
+    def summary_cards():
+        idea_stats = summary["idea_stats"]
+        return {
+            "uploads": summary["uploads"],
+            "recent": summary["recent"],
+            "statistics": len(idea_stats) if idea_stats else 0,
+        }
 
     now = timezone.now()
     monthly_report = (
-        Project.objects.filter(
-            created_at__year=now.year,
-            created_at__month=now.month,
-        )
-        if is_admin
-        else user.projects.filter(
-            created_at__year=now.year,
-            created_at__month=now.month,
-        )
-    )
-
-    total_uploads = queryset.count()
-    recent_uploads = queryset.filter(created_at__gte=now - timedelta(days=7)).count()
-    stat_total = len(idea_stats) if idea_stats else 0
-    id_confidence = list(
-        queryset.values("id", "public_id", "user__username")
-        .annotate(avg_conf=Avg("prediction_confidence"))
-        .order_by("-avg_conf")
-    )
+        Project.objects if is_admin else user.projects
+    ).created_in_month(now.year, now.month)
 
     return {
         "is_admin": is_admin,
         "history": queryset,
-        "avg_confidence": round(avg_confidence, 2) if avg_confidence else None,
-        "idea_stats": idea_stats,
+        "avg_confidence": avg_confidence,
+        # Contributors get a plain None: the template tests `is not None`.
+        "idea_stats": SimpleLazyObject(lambda: summary["idea_stats"]) if is_admin else None,
         "monthly_report": monthly_report,
         "profile": user,
         "id_confidence": id_confidence,
-        "summary": {
-            "uploads": total_uploads,
-            "recent": recent_uploads,
-            "statistics": stat_total,
-        },
+        "summary": SimpleLazyObject(summary_cards),
     }
 
 
+def _collect_dashboard_data(user: CustomUser, search_query=None):
+    is_admin = user.is_staff or user.role == "admin"
+    queryset = Project.objects.visible_to(user)
+    
+    if search_query:
+        queryset = search.matching(queryset, search_query)
+        summary = SimpleLazyObject(lambda: _search_summary(queryset, is_admin))
+    else:
+        # Unfiltered pages read the maintained rollups, cached per scope until
+        # an upload in that scope changes (see hub.caching).
+        scope = None if is_admin else user
+        summary = SimpleLazyObject(
+            lambda: caching.fragment("summary", scope, lambda: rollups.dashboard_summary(scope))
+        )
+
+    # An unevaluated queryset: it only runs if the template iterates it.
+    return _dashboard_context(user, is_admin, queryset, summary, _id_confidence_rows(queryset))
+
+
+async def _acollect_dashboard_data(user: CustomUser):
+    """
+    Unfiltered `_collect_dashboard_data` with the summary and confidence map
+    read up front, for the async statistics page, which renders all of it.
+    """
+
+    is_admin = user.is_staff or user.role == "admin"
+    queryset = Project.objects.visible_to(user)
+    scope = None if is_admin else user
+    summary, id_confidence = await asyncio.gather(
+        caching.afragment("summary", scope, lambda: rollups.adashboard_summary(scope)),
+        akeyset_page(_id_confidence_rows(queryset), order_field=CONFIDENCE_ORDER),
+    )
+    return _dashboard_context(user, is_admin, queryset, summary, id_confidence)
+
+
+def _submit_upload(project: Project, uploaded_file=None) -> bool:
+    """
+    Save a new upload, reusing an identical earlier upload's blob and score
+    when there is one, otherwise queueing it for prediction. Returns True
+    when an earlier score was reused.
+    """
+
+    already_scored = dedup.apply_duplicate(project, uploaded_file)
+    with transaction.atomic():
+        project.save()
+        if not already_scored:
+            jobs.enqueue_prediction(project)
+    return already_scored
+
+
+@evidence_uploads
 @login_required(login_url="login")
 def dashboard_view(request):
     user: CustomUser = request.user
     search_query = request.GET.get('search', '')
-    form = UploadForm(request.POST or None, request.FILES or None)
+    form = UploadForm(
+        request.POST or None,
+        request.FILES or None,
+        upload_errors=getattr(request, "upload_errors", None),
+    )
 
     if request.method == "POST":
         if user.is_staff or user.role == "admin":
@@ -142,19 +225,17 @@ def dashboard_view(request):
         if form.is_valid():
             pending_upload = form.save(commit=False)
             pending_upload.user = user
-            payload = {
-                "idea": pending_upload.idea,
-                "description": pending_upload.description or "",
-                "file_type": pending_upload.file_type,
-            }
-            confidence = _predict_confidence(payload)
-            pending_upload.prediction_confidence = confidence
-            pending_upload.verdict = "Likely True" if confidence >= 60 else "Needs Review"
-            pending_upload.save()
-            messages.success(
-                request,
-                "Upload received. Confidence score prepared for your review.",
-            )
+            already_scored = _submit_upload(pending_upload, form.cleaned_data.get("file"))
+            if already_scored:
+                messages.success(
+                    request,
+                    "This evidence was checked before. Its earlier confidence score was reused.",
+                )
+            else:
+                messages.success(
+                    request,
+                    "Upload received. Its confidence score will appear here once scoring finishes.",
+                )
             return redirect("dashboard")
         messages.error(
             request,
@@ -164,46 +245,417 @@ def dashboard_view(request):
     context = _collect_dashboard_data(user, search_query)
     context["form"] = form
     context["search_query"] = search_query
+    context["pending_uploads"] = (
+        []
+        if context["is_admin"]
+        else list(user.projects.filter(verdict="Pending").for_listing()[:5])
+    )
     return render(request, "dashboard.html", context)
 
 
+@login_required(login_url="login")
+def upload_status_view(request, pk):
+    upload = get_object_or_404(Project.objects.visible_to(request.user), pk=pk)
+    job = upload.jobs.filter(kind="predict").first()
+    return JsonResponse(
+        {
+            "id": upload.pk,
+            "public_id": upload.public_id,
+            "verdict": upload.verdict,
+            "prediction_confidence": float(upload.prediction_confidence),
+            "job": (
+                {"status": job.status, "attempts": job.attempts}
+                if job
+                else None
+            ),
+        }
+    )
+
+
+def _json_body(request):
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _resumable_state(session: UploadSession):
+    received = resumable.received_chunks(session)
+    return {
+        "upload_id": str(session.pk),
+        "status": session.status,
+        "file_name": session.file_name,
+        "total_size": session.total_size,
+        "chunk_size": session.chunk_size,
+        "total_chunks": session.total_chunks,
+        "received_chunks": resumable.as_ranges(received),
+        "received_bytes": sum(session.expected_chunk_size(index) for index in received),
+        "project": (
+            {
+                "id": session.project_id,
+                "public_id": session.project.public_id,
+                "status_url": reverse("upload_status", args=[session.project_id]),
+            }
+            if session.project_id
+            else None
+        ),
+    }
+
+
+@login_required(login_url="login")
+@require_POST
+def resumable_init_view(request):
+    user: CustomUser = request.user
+    if user.is_staff or user.role == "admin":
+        return JsonResponse({"error": "Administrators can only monitor submissions."}, status=403)
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({"error": "Send a JSON object."}, status=400)
+
+    file_type = data.get("file_type")
+    file_name = Path(str(data.get("file_name") or "")).name[:255]
+    try:
+        total_size = int(data.get("total_size"))
+    except (TypeError, ValueError):
+        total_size = 0
+    limit = settings.EVIDENCE_UPLOAD_LIMITS.get(file_type)
+    if file_type not in {"image", "video"}:
+        return JsonResponse({"error": "Resumable uploads accept images and videos."}, status=400)
+    if not file_name or total_size <= 0:
+        return JsonResponse({"error": "file_name and a positive total_size are required."}, status=400)
+    if limit and total_size > limit:
+        return JsonResponse(
+            {"error": f"{file_type.capitalize()} uploads are limited to {filesizeformat(limit)}."},
+            status=413,
+        )
+
+    session = UploadSession.objects.create(
+        user=user,
+        file_type=file_type,
+        file_name=file_name,
+        total_size=total_size,
+        chunk_size=settings.RESUMABLE_CHUNK_SIZE,
+    )
+    return JsonResponse(_resumable_state(session), status=201)
+
+
+@login_required(login_url="login")
+def resumable_status_view(request, session_id):
+    session = get_object_or_404(
+        UploadSession.objects.select_related("project"), pk=session_id, user=request.user
+    )
+    return JsonResponse(_resumable_state(session))
+
+
+@login_required(login_url="login")
+@require_http_methods(["PUT"])
+def resumable_chunk_view(request, session_id, index):
+    session = get_object_or_404(UploadSession, pk=session_id, user=request.user)
+    if session.status != "open":
+        return JsonResponse({"error": "This upload is already finalized."}, status=409)
+    try:
+        written = resumable.write_chunk(session, index, request)
+    except resumable.ChunkError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse({"index": index, "received": written})
+
+
+@login_required(login_url="login")
+@require_POST
+def resumable_finalize_view(request, session_id):
+    session = get_object_or_404(
+        UploadSession.objects.select_related("project"), pk=session_id, user=request.user
+    )
+    if session.project_id:
+        return JsonResponse(_resumable_state(session))
+    missing = resumable.missing_chunks(session)
+    if missing:
+        return JsonResponse(
+            {"error": "Some chunks have not been received.", "missing_chunks": missing[:100]},
+            status=409,
+        )
+    # Only the request that flips the session out of "open" assembles it, so
+    # retried or concurrent finalize calls can never create a second Project.
+    if not UploadSession.objects.filter(pk=session.pk, status="open").update(status="finalizing"):
+        return JsonResponse({"error": "This upload is already being finalized."}, status=409)
+
+    name = None
+    try:
+        name, content_hash = resumable.assemble(session)
+        project = Project(
+            user=request.user,
+            file_type=session.file_type,
+            idea=session.file_name,
+            file=name,
+            content_hash=content_hash,
+        )
+        with transaction.atomic():
+            _submit_upload(project)
+            session.project = project
+            session.status = "complete"
+            session.save(update_fields=["project", "status", "updated_at"])
+    except Exception:
+        UploadSession.objects.filter(pk=session.pk).update(status="open")
+        if name:
+            default_storage.delete(name)
+        raise
+    if project.file.name != name:
+        # An identical upload already exists; its stored blob was reused.
+        default_storage.delete(name)
+    resumable.discard(session)
+    return JsonResponse(_resumable_state(session), status=201)
+
+
 @login_required(login_url="login")
 def project_view(request):
     context = _collect_dashboard_data(request.user)
+    context["history"] = keyset_page(context["history"].for_listing())
     return render(request, "project.html", context)
 
 
 @login_required(login_url="login")
+def project_more_view(request):
+    user: CustomUser = request.user
+    try:
+        page = keyset_page(
+            Project.objects.visible_to(user).for_listing(),
+            request.GET.get("cursor"),
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Invalid cursor.")
+    html = render_to_string(
+        "partials/project_rows.html",
+        {"history": page, "is_admin": user.is_staff or user.role == "admin"},
+        request=request,
+    )
+    return JsonResponse({"html": html, "next_cursor": page.next_cursor})
+
+
+@login_required(login_url="login")
+@read_from_replica
 def statistics_view(request):
     context = _collect_dashboard_data(request.user)
+    context["id_confidence"] = keyset_page(context["id_confidence"], order_field=CONFIDENCE_ORDER)
     return render(request, "statistics.html", context)
 
 
+@async_login_required(login_url="login")
+@read_from_replica
+async def astatistics_view(request):
+    context = await _acollect_dashboard_data(request.user)
+    return await arender(request, "statistics.html", context)
+
+
 @login_required(login_url="login")
+@read_from_replica
+def statistics_more_view(request):
+    user: CustomUser = request.user
+    try:
+        page = keyset_page(
+            _id_confidence_rows(Project.objects.visible_to(user)),
+            request.GET.get("cursor"),
+            order_field=CONFIDENCE_ORDER,
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Invalid cursor.")
+    html = render_to_string(
+        "partials/confidence_rows.html",
+        {"id_confidence": page, "is_admin": user.is_staff or user.role == "admin"},
+        request=request,
+    )
+    return JsonResponse({"html": html, "next_cursor": page.next_cursor})
+
+
+REPORT_YEARS = range(2024, 2029)
+
+
+def _report_picker(context, selected_year: int, selected_month: int, totals) -> None:
+    context['selected_month'] = selected_month
+    context['selected_year'] = selected_year
+    context['year_range'] = REPORT_YEARS
+    context['month_options'] = []
+    for number in range(1, 13):
+        row = totals.get((selected_year, number))
+        context['month_options'].append(
+            {"number": number, "name": calendar.month_name[number], "uploads": row.uploads if row else 0}
+        )
+    context['year_options'] = [
+        {
+            "year": year,
+            "uploads": sum(row.uploads for (row_year, _), row in totals.items() if row_year == year),
+        }
+        for year in REPORT_YEARS
+    ]
+    context['selected_totals'] = totals.get((selected_year, selected_month))
+
+
+@login_required(login_url="login")
+@read_from_replica
 def reports_view(request):
     context = _collect_dashboard_data(request.user)
     if not context["is_admin"]:
         return redirect("dashboard")
     
-    now = timezone.now()
-    selected_month = int(request.GET.get('month', now.month))
-    selected_year = int(request.GET.get('year', now.year))
+    try:
+        selected_year, selected_month = _report_month(request)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
     
-    context['monthly_report'] = Project.objects.filter(
-        created_at__year=selected_year,
-        created_at__month=selected_month,
+    context['monthly_report'] = keyset_page(
+        _monthly_queryset(selected_year, selected_month).for_listing()
     )
-    context['selected_month'] = selected_month
-    context['selected_year'] = selected_year
-    context['year_range'] = range(2024, 2029)
+    # Picker totals for every month in REPORT_YEARS come from one rollup query.
+    _report_picker(context, selected_year, selected_month, rollups.month_totals(REPORT_YEARS))
     
-    # Add all registered users and their login logs
-    context['all_users'] = CustomUser.objects.all().order_by('-date_joined')
-    context['recent_logins'] = UserLoginLog.objects.all()[:50]
+    context['recent_logins'] = UserLoginLog.objects.for_listing()[:50]
     
     return render(request, "reports.html", context)
 
 
+@async_login_required(login_url="login")
+@read_from_replica
+async def areports_view(request):
+    user: CustomUser = request.user
+    if not (user.is_staff or user.role == "admin"):
+        return redirect("dashboard")
+
+    try:
+        selected_year, selected_month = _report_month(request)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    # Nothing the reports template reads from the dashboard context touches
+    # the database, so its lazy sync version is safe to build here.
+    context = _collect_dashboard_data(user)
+    monthly_report, totals = await asyncio.gather(
+        akeyset_page(_monthly_queryset(selected_year, selected_month).for_listing()),
+        rollups.amonth_totals(REPORT_YEARS),
+    )
+    context['monthly_report'] = monthly_report
+    _report_picker(context, selected_year, selected_month, totals)
+    context['recent_logins'] = UserLoginLog.objects.for_listing()[:50]
+    return await arender(request, "reports.html", context)
+
+
+@login_required(login_url="login")
+@read_from_replica
+def reports_more_view(request):
+    user: CustomUser = request.user
+    if not (user.is_staff or user.role == "admin"):
+        return HttpResponseForbidden("Only administrators can view reports.")
+
+    try:
+        selected_year, selected_month = _report_month(request)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+    try:
+        page = keyset_page(
+            _monthly_queryset(selected_year, selected_month).for_listing(),
+            request.GET.get("cursor"),
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Invalid cursor.")
+    html = render_to_string(
+        "partials/report_entries.html",
+        {"monthly_report": page},
+        request=request,
+    )
+    return JsonResponse({"html": html, "next_cursor": page.next_cursor})
+
+
+@login_required(login_url="login")
+def reports_export_view(request):
+    user: CustomUser = request.user
+    if not (user.is_staff or user.role == "admin"):
+        return HttpResponseForbidden("Only administrators can export reports.")
+
+    try:
+        selected_year, selected_month = _report_month(request)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+    return exports.response(
+        exports.DATASETS["uploads"], year=selected_year, month=selected_month
+    )
+
+
+@login_required(login_url="login")
+def export_view(request, dataset):
+    user: CustomUser = request.user
+    if not (user.is_staff or user.role == "admin"):
+        return HttpResponseForbidden("Only administrators can export data.")
+    if dataset not in exports.DATASETS:
+        raise Http404("Unknown export.")
+
+    fmt = request.GET.get("format", "csv")
+    if fmt not in exports.FORMATS:
+        return HttpResponseBadRequest("Format must be csv or jsonl.")
+    try:
+        year = int(request.GET["year"]) if request.GET.get("year") else None
+        month = int(request.GET["month"]) if request.GET.get("month") else None
+    except ValueError:
+        return HttpResponseBadRequest("Year and month must be numbers.")
+    try:
+        exports.check_month(year, month)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+    return exports.response(
+        exports.DATASETS[dataset],
+        fmt,
+        compress=request.GET.get("gzip") in ("1", "true"),
+        year=year,
+        month=month,
+        username=request.GET.get("user") or None,
+    )
+
+
+@login_required(login_url="login")
+def cache_stats_view(request):
+    user: CustomUser = request.user
+    if not (user.is_staff or user.role == "admin"):
+        return HttpResponseForbidden("Only administrators can view cache statistics.")
+    if request.method == "POST" and request.POST.get("reset"):
+        caching.reset_stats()
+    return JsonResponse({"timeout": caching.timeout(), "fragments": caching.stats()})
+
+
+def metrics_view(request):
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token and constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        allowed = True
+    else:
+        user = request.user
+        allowed = user.is_authenticated and (user.is_staff or user.role == "admin")
+    if not allowed:
+        return HttpResponseForbidden("Metrics are only available to administrators.")
+    return HttpResponse(metrics.exposition(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def query_profiles_view(request):
+    context = {
+        **admin.site.each_context(request),
+        "title": "Query profiles",
+        "enabled": profiling.enabled(),
+        "slow_ms": profiling.slow_ms(),
+        "profiles": profiling.listing(),
+    }
+    return render(request, "admin/query_profiles.html", context)
+
+
+def query_profile_view(request, profile_id):
+    profile = profiling.load(profile_id)
+    if profile is None:
+        raise Http404("No such query profile.")
+    if request.GET.get("format") == "json":
+        return JsonResponse(profile)
+    context = {
+        **admin.site.each_context(request),
+        "title": f"Query profile {profile_id}",
+        "profile": profile,
+    }
+    return render(request, "admin/query_profile.html", context)
+
+
 @login_required(login_url="login")
 def upload_delete_view(request, pk):
     upload = get_object_or_404(Project, pk=pk)
@@ -225,6 +677,7 @@ def upload_delete_view(request, pk):
 @login_required(login_url="login")
 def profile_view(request):
     context = _collect_dashboard_data(request.user)
+    context["history"] = context["history"].for_listing()
     return render(request, "profile.html", context)
 
 